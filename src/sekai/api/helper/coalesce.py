@@ -0,0 +1,90 @@
+import asyncio
+import functools
+import inspect
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar, cast
+
+from pydantic import BaseModel
+
+_T = TypeVar("_T")
+_Api = TypeVar("_Api")
+
+
+def _freeze(value: Any) -> Any:
+    # batch lookups take lists of ids or models, which are keyed by their contents.
+    if isinstance(value, list | tuple):
+        return tuple(map(_freeze, cast(list[Any], value)))
+    if isinstance(value, BaseModel):
+        return (type(value), _freeze(list(value.__dict__.items())))
+    return value
+
+
+@dataclass
+class CoalesceStats:
+    calls: Counter[str] = field(default_factory=Counter)
+    collapsed: Counter[str] = field(default_factory=Counter)
+
+    def __str__(self) -> str:
+        return ", ".join(
+            f"{name}: {self.collapsed[name]}/{calls} collapsed"
+            for name, calls in self.calls.most_common()
+        )
+
+
+class SingleFlight:
+    # concurrent calls with the same key share the result of the call already in flight.
+    stats: CoalesceStats
+    _flights: dict[Hashable, asyncio.Task[Any]]
+
+    def __init__(self) -> None:
+        self.stats = CoalesceStats()
+        self._flights = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, name: str, key: Hashable, call: Callable[[], Awaitable[_T]]) -> _T:
+        self.stats.calls[name] += 1
+        if (task := self._flights.get(key)) is not None:
+            self.stats.collapsed[name] += 1
+        else:
+            task = self._flights[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        # shielded, so one cancelled caller does not cancel the call shared with the others.
+        return await asyncio.shield(task)
+
+
+class CoalescingApi(Generic[_Api]):
+    # wraps an api, so its coroutine methods are coalesced while other attributes pass through.
+    api: _Api
+    flight: SingleFlight
+
+    def __init__(self, api: _Api, flight: SingleFlight | None = None) -> None:
+        self.api = api
+        self.flight = flight or SingleFlight()
+
+    @property
+    def stats(self) -> CoalesceStats:
+        return self.flight.stats
+
+    def _wrap(self, name: str, method: Callable[..., Awaitable[Any]]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (name, _freeze(args), _freeze(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return await method(*args, **kwargs)
+            return await self.flight.do(name, key, functools.partial(method, *args, **kwargs))
+
+        return _wrapper
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.api, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+        wrapped = self._wrap(name, attr)
+        setattr(self, name, wrapped)
+        return wrapped
@@ -1,6 +1,7 @@
 import abc
 from typing import AsyncIterable
 
+from sekai.core.models import SharedModel
 from sekai.core.models.card import CardInfo
 from sekai.core.models.chara import Character, CharacterInfo, ExtraCharacter, GameCharacter
 from sekai.core.models.gacha import Gacha
@@ -18,6 +19,10 @@ class MasterApi(abc.ABC):
     async def get_card_info(self, id: int) -> CardInfo:
         ...
 
+    @abc.abstractmethod
+    async def get_card_infos(self, ids: list[int]) -> list[CardInfo]:
+        ...
+
     @abc.abstractmethod
     def search_card_info_by_title(self, keywords: str) -> AsyncIterable[CardInfo]:
         ...
@@ -30,6 +35,10 @@ class MasterApi(abc.ABC):
     async def get_game_character(self, id: int) -> GameCharacter:
         ...
 
+    @abc.abstractmethod
+    async def get_game_characters(self, ids: list[int]) -> list[GameCharacter]:
+        ...
+
     @abc.abstractmethod
     def iter_extra_characters(self) -> AsyncIterable[ExtraCharacter]:
         ...
@@ -38,6 +47,10 @@ class MasterApi(abc.ABC):
     async def get_extra_character(self, id: int) -> ExtraCharacter:
         ...
 
+    @abc.abstractmethod
+    async def get_extra_characters(self, ids: list[int]) -> list[ExtraCharacter]:
+        ...
+
     @abc.abstractmethod
     def iter_character_infos(self) -> AsyncIterable[CharacterInfo]:
         ...
@@ -46,6 +59,10 @@ class MasterApi(abc.ABC):
     async def get_character_info(self, character: Character) -> CharacterInfo:
         ...
 
+    @abc.abstractmethod
+    async def get_character_infos(self, characters: list[Character]) -> list[CharacterInfo]:
+        ...
+
     @abc.abstractmethod
     def iter_music_infos(self) -> AsyncIterable[MusicInfo]:
         ...
@@ -86,6 +103,10 @@ class MasterApi(abc.ABC):
     async def get_current_system_info(self) -> SystemInfo:
         ...
 
+    @abc.abstractmethod
+    async def get_freshness_token(self, type: type[SharedModel]) -> str | None:
+        ...
+
     @abc.abstractmethod
     def iter_gachas(self) -> AsyncIterable[Gacha]:
         ...
@@ -1,19 +1,35 @@
 import asyncio
+import fcntl
+import functools
+import hashlib
 import logging
+import os
 import shutil
 from asyncio import Event
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import timedelta
 from pathlib import Path
-from typing import AsyncIterable, Awaitable, Callable, Protocol, TypeVar
+from typing import (
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Iterable,
+    Mapping,
+    Protocol,
+    TextIO,
+    TypeVar,
+    cast,
+)
+from uuid import uuid1
 
 from aiofile import async_open
 from packaging.version import Version
-from pydantic import RootModel
-from tenacity import before_sleep_log, retry, wait_fixed
+from pydantic import BaseModel, RootModel
+from tenacity import AsyncRetrying, before_sleep_log, stop_after_attempt, wait_random_exponential
 
 from sekai.api.exc import ObjectNotFound
 from sekai.api.master import MasterApi
+from sekai.core.models import SharedModel
 from sekai.core.models.card import CardInfo
 from sekai.core.models.chara import (
     Character,
@@ -26,6 +42,12 @@ from sekai.core.models.gacha import Gacha
 from sekai.core.models.live import LiveInfo
 from sekai.core.models.music import MusicInfo, MusicVersion
 from sekai.core.models.system import SystemInfo
+from sekai.utils.breaker import BreakerState, CircuitBreaker
+from sekai.utils.ratelimit import Priority, request_priority
+
+from .chara import lookup_character_infos
+from .schedule import CheckScheduler
+from .store import RecordStore, StoreFormat, make_record_store
 
 logger = logging.getLogger(__name__)
 
@@ -36,10 +58,230 @@ class IdModel(Protocol):
 
 AnyIdModel = TypeVar("AnyIdModel", bound=IdModel)
 
+Snapshot = dict[type[IdModel], dict[int, IdModel]]
+
+RecordHashes = RootModel[dict[str, dict[int, str]]]
+
+FreshnessTokens = RootModel[dict[str, str]]
+
+
+class CacheIndex(BaseModel):
+    versions_of_music: dict[int, list[int]] = {}
+    live_infos_of_music: dict[int, list[int]] = {}
+
+    def add(self, model: IdModel) -> None:
+        match model:
+            case MusicVersion():
+                self.versions_of_music.setdefault(model.music_id, []).append(model.id)
+            case LiveInfo():
+                self.live_infos_of_music.setdefault(model.music_id, []).append(model.id)
+            case _:
+                pass
+
+
+@dataclass(frozen=True)
+class CacheChanges:
+    added: list[int] = field(default_factory=list)
+    changed: list[int] = field(default_factory=list)
+    removed: list[int] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def __str__(self) -> str:
+        return f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed"
+
 
 @dataclass(frozen=True)
 class CacheStrategy:
     check_cycle: timedelta = timedelta(hours=1)
+    # when given, checks are scheduled between these cycles from the observed update times.
+    min_check_cycle: timedelta | None = None
+    max_check_cycle: timedelta | None = None
+    # updates seen in an hour of the week before checks are sped up around it.
+    min_update_hits: int = 2
+    # keep the whole cache generation in memory and serve lookups from it.
+    snapshot: bool = True
+    format: StoreFormat = StoreFormat.FILES
+    # failed updates are retried with jittered exponential backoff between these delays.
+    retry_delay: timedelta = timedelta(seconds=5)
+    max_retry_delay: timedelta = timedelta(minutes=5)
+    # after this many failed attempts in a row, updates are paused for the cooldown.
+    breaker_threshold: int = 5
+    breaker_cooldown: timedelta = timedelta(minutes=30)
+
+
+class CacheGeneration:
+    name: str
+    path: Path
+    strategy: CacheStrategy
+    store: RecordStore
+    _types: list[type[IdModel]]
+    _system_info: SystemInfo | None
+    _snapshot: Snapshot | None
+    _snapshot_lock: asyncio.Lock
+    _index: CacheIndex | None
+    _hashes: dict[str, dict[int, str]] | None
+    _tokens: dict[str, str] | None
+
+    def __init__(self, path: Path, strategy: CacheStrategy, types: list[type[IdModel]]) -> None:
+        self.name = path.name
+        self.path = path
+        self.strategy = strategy
+        self.store = make_record_store(strategy.format, path)
+        self._types = types
+        self._system_info = None
+        self._snapshot = None
+        self._snapshot_lock = asyncio.Lock()
+        self._index = None
+        self._hashes = None
+        self._tokens = None
+
+    @property
+    def _system_info_path(self) -> Path:
+        return self.path / ".cache"
+
+    @property
+    def _index_path(self) -> Path:
+        return self.path / ".index"
+
+    @property
+    def _hashes_path(self) -> Path:
+        return self.path / ".hashes"
+
+    @property
+    def _tokens_path(self) -> Path:
+        return self.path / ".tokens"
+
+    @property
+    def _format_path(self) -> Path:
+        return self.path / ".format"
+
+    def write_format(self) -> None:
+        self._format_path.write_text(self.strategy.format.name)
+
+    def readable(self) -> bool:
+        # records are only readable in the format they are written in.
+        try:
+            return self._format_path.read_text() == self.strategy.format.name
+        except FileNotFoundError:
+            return False
+
+    async def get_system_info(self) -> SystemInfo | None:
+        if self._system_info is not None:
+            return self._system_info
+        if not self._system_info_path.exists():
+            return None
+        async with async_open(self._system_info_path, "r") as afp:
+            data = await afp.read()
+        self._system_info = SystemInfo.model_validate_json(data)
+        return self._system_info
+
+    async def write_system_info(self, info: SystemInfo) -> None:
+        data = info.model_dump_json()
+        async with async_open(self._system_info_path, "w") as afp:
+            await afp.write(data)
+        self._system_info = info
+
+    async def load_index(self) -> CacheIndex | None:
+        if self._index is not None:
+            return self._index
+        if not self._index_path.exists():
+            return None
+        async with async_open(self._index_path, "r") as afp:
+            data = await afp.read()
+        self._index = CacheIndex.model_validate_json(data)
+        return self._index
+
+    async def write_index(self, index: CacheIndex) -> None:
+        data = index.model_dump_json()
+        async with async_open(self._index_path, "w") as afp:
+            await afp.write(data)
+        self._index = index
+
+    async def load_hashes(self) -> dict[str, dict[int, str]]:
+        if self._hashes is not None:
+            return self._hashes
+        if not self._hashes_path.exists():
+            return {}
+        async with async_open(self._hashes_path, "r") as afp:
+            data = await afp.read()
+        self._hashes = RecordHashes.model_validate_json(data).root
+        return self._hashes
+
+    async def write_hashes(self, hashes: dict[str, dict[int, str]]) -> None:
+        data = RecordHashes(root=hashes).model_dump_json()
+        async with async_open(self._hashes_path, "w") as afp:
+            await afp.write(data)
+        self._hashes = hashes
+
+    async def load_tokens(self) -> dict[str, str]:
+        if self._tokens is not None:
+            return self._tokens
+        if not self._tokens_path.exists():
+            return {}
+        async with async_open(self._tokens_path, "r") as afp:
+            data = await afp.read()
+        self._tokens = FreshnessTokens.model_validate_json(data).root
+        return self._tokens
+
+    async def write_tokens(self, tokens: dict[str, str]) -> None:
+        data = FreshnessTokens(root=tokens).model_dump_json()
+        async with async_open(self._tokens_path, "w") as afp:
+            await afp.write(data)
+        self._tokens = tokens
+
+    @staticmethod
+    def _decode(typ: type[AnyIdModel], data: bytes) -> AnyIdModel:
+        wrapped_type = RootModel.__class_getitem__(typ)
+        cache = wrapped_type.model_validate_json(data)  # type: ignore
+        return cache.root  # type: ignore
+
+    async def _read(self, typ: type[AnyIdModel]) -> AsyncIterable[AnyIdModel]:
+        async for data in self.store.iter(typ.__name__):
+            yield self._decode(typ, data)
+
+    async def load_snapshot(self) -> Snapshot:
+        async def load(typ: type[IdModel]) -> dict[int, IdModel]:
+            return {model.id: model async for model in self._read(typ)}
+
+        async with self._snapshot_lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            models = await asyncio.gather(*map(load, self._types))
+            self._snapshot = dict(zip(self._types, models))
+            logger.info(f"loaded snapshot of cache generation {self.name}.")
+            return self._snapshot
+
+    async def get(self, typ: type[AnyIdModel], id: int) -> AnyIdModel:
+        if self.strategy.snapshot:
+            snapshot = await self.load_snapshot()
+            if (model := snapshot.get(typ, {}).get(id)) is None:
+                raise ObjectNotFound
+            return cast(AnyIdModel, model)
+        if (data := await self.store.read(typ.__name__, id)) is None:
+            raise ObjectNotFound
+        return self._decode(typ, data)
+
+    async def get_many(self, typ: type[AnyIdModel], ids: list[int]) -> list[AnyIdModel]:
+        if self.strategy.snapshot:
+            snapshot = await self.load_snapshot()
+            models = cast(dict[int, AnyIdModel], snapshot.get(typ, {}))
+        else:
+            records = await self.store.read_many(typ.__name__, ids)
+            models = {id: self._decode(typ, data) for id, data in records.items()}
+        if not models.keys() >= set(ids):
+            raise ObjectNotFound
+        return [models[id] for id in ids]
+
+    async def iter(self, typ: type[AnyIdModel]) -> AsyncIterable[AnyIdModel]:
+        if self.strategy.snapshot:
+            snapshot = await self.load_snapshot()
+            for model in list(snapshot.get(typ, {}).values()):
+                yield cast(AnyIdModel, model)
+            return
+        async for model in self._read(typ):
+            yield model
 
 
 class CachedMasterApi(MasterApi):
@@ -48,7 +290,15 @@ class CachedMasterApi(MasterApi):
     _updating: Event
     _upstreams: dict[type[IdModel], Callable[[], AsyncIterable[IdModel]]]
     _upstream_system_info: Callable[[], Awaitable[SystemInfo]]
+    _upstream_freshness_token: Callable[[type[IdModel]], Awaitable[str | None]]
     _cache_task: asyncio.Task[None] | None
+    # the target of the current link the generation is opened for.
+    _opened_name: str | None
+    _opened: CacheGeneration | None
+    _writer_lock: TextIO | None
+    breaker: CircuitBreaker
+    scheduler: CheckScheduler
+    changes: dict[type[IdModel], CacheChanges]
 
     def __init__(
         self, upstream: MasterApi, cache_path: Path, strategy: CacheStrategy | None = None
@@ -67,18 +317,97 @@ class CachedMasterApi(MasterApi):
             Gacha: upstream.iter_gachas,
         }
         self._upstream_system_info = upstream.get_current_system_info
+        self._upstream_freshness_token = upstream.get_freshness_token  # type: ignore
         self._updating.set()
         self._cache_task = None
+        self._opened_name = None
+        self._opened = None
+        self._writer_lock = None
+        self.changes = {}
+        self.breaker = CircuitBreaker(self.strategy.breaker_cooldown)
+        self.scheduler = CheckScheduler(
+            self._schedule_path,
+            self.strategy.check_cycle,
+            self.strategy.min_check_cycle,
+            self.strategy.max_check_cycle,
+            min_hits=self.strategy.min_update_hits,
+        )
 
     @property
-    def _cached_system_info_path(self) -> Path:
-        return self.path / ".cache"
+    def _current_path(self) -> Path:
+        return self.path / "current"
+
+    @property
+    def _generations_path(self) -> Path:
+        return self.path / "generations"
 
-    def _models_path(self, typ: type[AnyIdModel]) -> Path:
-        return self.path / typ.__name__
+    @property
+    def _schedule_path(self) -> Path:
+        return self.path / "schedule.json"
+
+    @property
+    def _lock_path(self) -> Path:
+        return self.path / "writer.lock"
 
-    def _cache_path(self, typ: type[AnyIdModel], id: int) -> Path:
-        return (self._models_path(typ) / str(id)).with_suffix(".json")
+    @property
+    def _generation(self) -> CacheGeneration | None:
+        # another process may have swapped in a newer generation since the last lookup.
+        if (name := self._current_name()) != self._opened_name:
+            self._opened_name = name
+            self._opened = self._open_generation(name)
+        return self._opened
+
+    @property
+    def generation(self) -> str | None:
+        return self._generation.name if self._generation else None
+
+    def _make_generation(self, name: str) -> CacheGeneration:
+        return CacheGeneration(
+            self._generations_path / name, self.strategy, list(self._upstreams.keys())
+        )
+
+    def _current_name(self) -> str | None:
+        try:
+            return Path(os.readlink(self._current_path)).name
+        except OSError:
+            return None
+
+    def _open_generation(self, name: str | None) -> CacheGeneration | None:
+        if name is None or not (self._generations_path / name).is_dir():
+            return None
+        generation = self._make_generation(name)
+        if not generation.readable():
+            logger.warning(f"cache generation {name} is in another format, it will be rebuilt.")
+            return None
+        return generation
+
+    def _swap_generation(self, generation: CacheGeneration) -> None:
+        # replacing the symlink with rename is atomic, readers see either generation.
+        staging = self.path / "current.tmp"
+        staging.unlink(missing_ok=True)
+        staging.symlink_to(Path(self._generations_path.name) / generation.name)
+        os.replace(staging, self._current_path)
+        self._opened_name = generation.name
+        self._opened = generation
+
+    def _cleanup_generations(self, *keep: CacheGeneration | None) -> None:
+        names = {generation.name for generation in keep if generation}
+        for item in self.path.iterdir():
+            if item in (
+                self._current_path,
+                self._generations_path,
+                self._schedule_path,
+                self._lock_path,
+            ):
+                continue
+            # files left by the layout before generations.
+            if item.is_dir():
+                shutil.rmtree(item)
+            else:
+                item.unlink()
+        for item in self._generations_path.iterdir():
+            if item.name not in names:
+                shutil.rmtree(item, ignore_errors=True)
 
     def run_cache_task(self) -> None:
         assert self._cache_task is None, "another cache task is running."
@@ -88,88 +417,210 @@ class CachedMasterApi(MasterApi):
         assert self._cache_task is not None, "no cache task is running."
         self._cache_task.cancel()
         self._cache_task = None
+        if self._writer_lock is not None:
+            self._writer_lock.close()
+            self._writer_lock = None
+
+    def _acquire_writer_lock(self) -> bool:
+        # held until the process exits, the lock is released by the system if it dies.
+        if self._writer_lock is not None:
+            return True
+        self.path.mkdir(parents=True, exist_ok=True)
+        lock = open(self._lock_path, "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return False
+        self._writer_lock = lock
+        return True
 
     async def get_current_system_info(self) -> SystemInfo:
-        if not self._cached_system_info_path.exists():
+        if not self._generation or not (info := await self._generation.get_system_info()):
             raise ObjectNotFound
-        async with async_open(self._cached_system_info_path, "r") as afp:
-            data = await afp.read()
-        return SystemInfo.model_validate_json(data)
-
-    async def _update_system_info(self, info: SystemInfo) -> None:
-        data = info.model_dump_json()
-        async with async_open(self._cached_system_info_path, "w") as afp:
-            await afp.write(data)
+        return info
 
     async def _cache_worker(self) -> None:
-        while True:
-            await self._check_and_update_cache()
-            await asyncio.sleep(self.strategy.check_cycle.total_seconds())
+        # cache updates should not hold back upstream requests made for users.
+        await self.scheduler.load()
+        # only one process updates and cleans up the cache, the others follow its current link,
+        # and take over once it is gone.
+        if not self._acquire_writer_lock():
+            logger.info(f"cache at {self.path} is updated by another process, following it.")
+            while not self._acquire_writer_lock():
+                await asyncio.sleep(self.strategy.check_cycle.total_seconds())
+        with request_priority(Priority.BACKGROUND):
+            while True:
+                if remaining := self.breaker.remaining:
+                    await self.scheduler.wait(timedelta(seconds=remaining))
+                try:
+                    await self._refresh_cache()
+                except Exception:
+                    self.breaker.trip()
+                    logger.error(
+                        f"cache update keeps failing, pausing for {self.strategy.breaker_cooldown} "
+                        f"and serving cache generation {self.generation}.",
+                        exc_info=True,
+                    )
+                    continue
+                self.breaker.reset()
+                await self.scheduler.wait(self.scheduler.next_delay())
+
+    def trigger_check(self) -> None:
+        # checks right away, even if updates are paused by the breaker.
+        self.scheduler.trigger()
+
+    async def _refresh_cache(self) -> None:
+        # a half-open breaker lets a single attempt probe whether the upstream is back.
+        attempts = (
+            1 if self.breaker.state == BreakerState.HALF_OPEN else self.strategy.breaker_threshold
+        )
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(attempts),
+            wait=wait_random_exponential(
+                multiplier=self.strategy.retry_delay.total_seconds(),
+                max=self.strategy.max_retry_delay.total_seconds(),
+            ),
+            before_sleep=before_sleep_log(logger, logging.WARNING, True),
+            reraise=True,
+        )
+        await retrying(self._check_and_update_cache)
+
+    async def _get_upstream_freshness_tokens(self) -> dict[type[IdModel], str | None]:
+        types = list(self._upstreams.keys())
+        tokens = await asyncio.gather(*map(self._upstream_freshness_token, types))
+        return dict(zip(types, tokens))
 
-    @retry(wait=wait_fixed(5), before_sleep=before_sleep_log(logger, logging.WARNING, True))
     async def _check_and_update_cache(self) -> None:
         if not self._updating.is_set():
             return
-        if self._cached_system_info_path.exists():
-            upstream = await self._upstream_system_info()
-            cached = await self.get_current_system_info()
-            if Version(cached.asset_version) >= Version(upstream.asset_version):
-                return
-        await self.update_cache()
-
-    async def update_cache(self) -> None:
+        if not self._generation or not (cached := await self._generation.get_system_info()):
+            await self.update_cache()
+            return
+        upstream = await self._upstream_system_info()
+        outdated = Version(cached.asset_version) < Version(upstream.asset_version)
+        tokens = await self._get_upstream_freshness_tokens()
+        cached_tokens = await self._generation.load_tokens()
+        # types without a token fall back to the asset version of the whole cache.
+        stale = [
+            typ
+            for typ, token in tokens.items()
+            if (outdated if token is None else token != cached_tokens.get(typ.__name__))
+        ]
+        if stale or outdated:
+            await self.update_cache(stale, tokens)
+            await self.scheduler.record_update()
+        self.scheduler.checked()
+
+    async def update_cache(
+        self,
+        types: Iterable[type[IdModel]] | None = None,
+        tokens: Mapping[type[IdModel], str | None] | None = None,
+    ) -> dict[type[IdModel], CacheChanges]:
         async def updater(
             typ: type[IdModel], provider: Callable[[], AsyncIterable[IdModel]]
-        ) -> None:
-            async for model in provider():
-                path = self._cache_path(typ, model.id)
-                wrapped = RootModel(root=model)
-                data = wrapped.model_dump_json()
-                async with async_open(path, "w") as afp:
-                    await afp.write(data)
+        ) -> CacheChanges:
+            name = typ.__name__
+            previous_hashes = previous_all_hashes.get(name, {})
+            type_hashes = hashes[name] = {}
+            changes = CacheChanges()
+            async with generation.store.writer(name) as writer:
+                async for model in provider():
+                    index.add(model)
+                    wrapped = RootModel(root=model)
+                    data = wrapped.model_dump_json().encode()
+                    digest = type_hashes[model.id] = hashlib.sha1(data).hexdigest()
+                    match previous_hashes.get(model.id):
+                        case None:
+                            changes.added.append(model.id)
+                        case previous_digest if previous_digest != digest:
+                            changes.changed.append(model.id)
+                        case _:
+                            assert previous
+                            if await writer.reuse(previous.store, name, model.id):
+                                continue
+                    await writer.write(model.id, data)
+            changes.removed.extend(id for id in previous_hashes if id not in type_hashes)
+            logger.info(f"cache of {name} is updated: {changes}.")
+            return changes
 
         assert self._updating.is_set(), "cache is updating."
         self._updating.clear()
+        index = CacheIndex()
+        hashes: dict[str, dict[int, str]] = {}
+        previous = self._generation
+        previous_all_hashes = await previous.load_hashes() if previous else {}
+        previous_tokens = await previous.load_tokens() if previous else {}
+        # types not to be refreshed are carried over from the previous generation.
+        stale = set(self._upstreams.keys()) if types is None or not previous else set(types)
+        providers: dict[type[IdModel], Callable[[], AsyncIterable[IdModel]]] = {
+            typ: provider if typ in stale or not previous else functools.partial(previous.iter, typ)
+            for typ, provider in self._upstreams.items()
+        }
+        # the new generation is built aside, the current one keeps serving until swapped.
+        generation = self._make_generation(uuid1().hex)
         try:
             upstream = await self._upstream_system_info()
-            self._rebuild_cache_tree()
-            updaters = [updater(typ, provider) for (typ, provider) in self._upstreams.items()]
-            await asyncio.gather(*updaters)
-            await self._update_system_info(upstream)
+            if tokens is None:
+                tokens = await self._get_upstream_freshness_tokens()
+            generation.store.clear()
+            generation.write_format()
+            updaters = [updater(typ, provider) for (typ, provider) in providers.items()]
+            changes = dict(zip(providers.keys(), await asyncio.gather(*updaters)))
+            await generation.write_index(index)
+            await generation.write_hashes(hashes)
+            await generation.write_tokens(
+                {
+                    typ.__name__: token
+                    for typ in providers.keys()
+                    if (
+                        token := tokens.get(typ)
+                        if typ in stale
+                        else previous_tokens.get(typ.__name__)
+                    )
+                }
+            )
+            await generation.write_system_info(upstream)
+            if self.strategy.snapshot:
+                await generation.load_snapshot()
+        except BaseException:
+            shutil.rmtree(generation.path, ignore_errors=True)
+            raise
         finally:
             self._updating.set()
+        self._swap_generation(generation)
+        # the previous generation is kept for readers which are still on it.
+        self._cleanup_generations(generation, previous)
+        self.changes = changes
+        return changes
 
-    def _rebuild_cache_tree(self) -> None:
-        shutil.rmtree(self.path)
-        self.path.mkdir()
-        for typ in self._upstreams.keys():
-            self._models_path(typ).mkdir()
+    async def get_freshness_token(self, type: type[SharedModel]) -> str | None:
+        if not self._generation:
+            return None
+        return (await self._generation.load_tokens()).get(type.__name__)
 
     async def _get_cache(self, typ: type[AnyIdModel], id: int) -> AnyIdModel:
-        await self._updating.wait()
-        path = self._cache_path(typ, id)
-        if not path.exists():
+        if not self._generation:
             raise ObjectNotFound
-        assert path.is_file(), f"{path} is not a file."
-        async with async_open(path, "r") as afp:
-            data = await afp.read()
-        wrapped_type = RootModel.__class_getitem__(typ)
-        cache = wrapped_type.model_validate_json(data)  # type: ignore
-        return cache.root  # type: ignore
+        return await self._generation.get(typ, id)
+
+    async def _get_caches(self, typ: type[AnyIdModel], ids: list[int]) -> list[AnyIdModel]:
+        if not self._generation:
+            if ids:
+                raise ObjectNotFound
+            return []
+        return await self._generation.get_many(typ, ids)
 
     async def _iter_caches(self, typ: type[AnyIdModel]) -> AsyncIterable[AnyIdModel]:
-        await self._updating.wait()
-        path = self._models_path(typ)
-        if not path.exists():
+        if not self._generation:
             return
-        for file in path.iterdir():
-            if file.suffix != ".json":
-                continue
-            async with async_open(file, "r") as afp:
-                data = await afp.read()
-            wrapped_type = RootModel.__class_getitem__(typ)
-            cache = wrapped_type.model_validate_json(data)  # type: ignore
-            yield cache.root  # type: ignore
+        async for model in self._generation.iter(typ):
+            yield model
+
+    async def _load_index(self) -> CacheIndex | None:
+        if not self._generation:
+            return None
+        return await self._generation.load_index()
 
     def iter_card_infos(self) -> AsyncIterable[CardInfo]:
         return self._iter_caches(CardInfo)
@@ -177,6 +628,9 @@ class CachedMasterApi(MasterApi):
     async def get_card_info(self, id: int) -> CardInfo:
         return await self._get_cache(CardInfo, id)
 
+    async def get_card_infos(self, ids: list[int]) -> list[CardInfo]:
+        return await self._get_caches(CardInfo, ids)
+
     def search_card_info_by_title(self, keywords: str) -> AsyncIterable[CardInfo]:
         raise NotImplementedError
 
@@ -186,12 +640,18 @@ class CachedMasterApi(MasterApi):
     async def get_game_character(self, id: int) -> GameCharacter:
         return await self._get_cache(GameCharacter, id)
 
+    async def get_game_characters(self, ids: list[int]) -> list[GameCharacter]:
+        return await self._get_caches(GameCharacter, ids)
+
     def iter_extra_characters(self) -> AsyncIterable[ExtraCharacter]:
         return self._iter_caches(ExtraCharacter)
 
     async def get_extra_character(self, id: int) -> ExtraCharacter:
         return await self._get_cache(ExtraCharacter, id)
 
+    async def get_extra_characters(self, ids: list[int]) -> list[ExtraCharacter]:
+        return await self._get_caches(ExtraCharacter, ids)
+
     async def iter_character_infos(self) -> AsyncIterable[CharacterInfo]:
         async for model in self.iter_game_characters():
             yield model
@@ -205,6 +665,9 @@ class CachedMasterApi(MasterApi):
             case CharacterType.EXTRA:
                 return await self.get_extra_character(character.id)
 
+    async def get_character_infos(self, characters: list[Character]) -> list[CharacterInfo]:
+        return await lookup_character_infos(self, characters)
+
     def iter_music_infos(self) -> AsyncIterable[MusicInfo]:
         return self._iter_caches(MusicInfo)
 
@@ -221,6 +684,10 @@ class CachedMasterApi(MasterApi):
         return await self._get_cache(MusicVersion, id)
 
     async def iter_versions_of_music(self, id: int) -> AsyncIterable[MusicVersion]:
+        if index := await self._load_index():
+            for version in index.versions_of_music.get(id, []):
+                yield await self.get_music_version(version)
+            return
         async for version in self.iter_music_versions():
             if version.music_id == id:
                 yield version
@@ -232,6 +699,10 @@ class CachedMasterApi(MasterApi):
         return await self._get_cache(LiveInfo, id)
 
     async def iter_live_infos_of_music(self, id: int) -> AsyncIterable[LiveInfo]:
+        if index := await self._load_index():
+            for info in index.live_infos_of_music.get(id, []):
+                yield await self.get_live_info(info)
+            return
         async for info in self.iter_live_infos():
             if info.music_id == id:
                 yield info
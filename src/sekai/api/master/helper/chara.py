@@ -0,0 +1,20 @@
+from sekai.api.master import MasterApi
+from sekai.core.models.chara import Character, CharacterInfo, CharacterType
+
+
+async def lookup_character_infos(
+    api: MasterApi, characters: list[Character]
+) -> list[CharacterInfo]:
+    # characters of each type are looked up in one batch, and returned in the given order.
+    game_characters = await api.get_game_characters(
+        [character.id for character in characters if character.type == CharacterType.GAME]
+    )
+    extra_characters = await api.get_extra_characters(
+        [character.id for character in characters if character.type == CharacterType.EXTRA]
+    )
+    infos: dict[tuple[CharacterType, int], CharacterInfo] = {}
+    for model in game_characters:
+        infos[(CharacterType.GAME, model.id)] = model
+    for model in extra_characters:
+        infos[(CharacterType.EXTRA, model.id)] = model
+    return [infos[(character.type, character.id)] for character in characters]
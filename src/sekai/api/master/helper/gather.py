@@ -0,0 +1,168 @@
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Sequence, cast
+
+from sekai.api.exc import ObjectNotFound
+from sekai.api.master import MasterApi
+from sekai.core.models import SharedModel
+
+_END = object()
+
+
+@dataclass(frozen=True)
+class GatherStrategy:
+    # seconds to wait for the current sources before sending the request to the next one.
+    hedge_delay: float = 1.0
+    smoothing: float = 0.2
+    # seconds recorded for a failed request, so failing sources fall behind.
+    failure_penalty: float = 10.0
+
+
+class MasterApiGatherer(MasterApi):
+    apis: list[MasterApi]
+    strategy: GatherStrategy
+    _latencies: list[float | None]
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> "MasterApiGatherer":
+        cls.__abstractmethods__ = frozenset()
+        return super().__new__(cls)
+
+    def __init__(self, apis: Sequence[MasterApi], strategy: GatherStrategy | None = None) -> None:
+        assert apis, "at least one api should be given."
+        self.apis = list(apis)
+        self.strategy = strategy or GatherStrategy()
+        self._latencies = [None] * len(apis)
+        self._wrap_methods()
+
+    @property
+    def latencies(self) -> list[float | None]:
+        return list(self._latencies)
+
+    def _record(self, index: int, latency: float) -> None:
+        if (previous := self._latencies[index]) is None:
+            self._latencies[index] = latency
+        else:
+            smoothing = self.strategy.smoothing
+            self._latencies[index] = previous * (1 - smoothing) + latency * smoothing
+
+    def _order(self) -> list[int]:
+        # unmeasured sources go first, so every source gets measured.
+        return sorted(range(len(self.apis)), key=lambda index: self._latencies[index] or 0)
+
+    async def _timed(self, index: int, awaitable: Any) -> Any:
+        start = time.monotonic()
+        try:
+            result = await awaitable
+        except (ObjectNotFound, NotImplementedError):
+            raise
+        except asyncio.CancelledError:
+            # a source losing the race took at least this long, which only tells if it is slower.
+            if (elapsed := time.monotonic() - start) > (self._latencies[index] or 0):
+                self._record(index, elapsed)
+            raise
+        except Exception:
+            self._record(index, self.strategy.failure_penalty)
+            raise
+        self._record(index, time.monotonic() - start)
+        return result
+
+    async def _race(
+        self, start: Callable[[int], Any], order: list[int], hedge: bool = True
+    ) -> tuple[int, Any]:
+        sources = iter(order)
+        pending: dict[asyncio.Future[Any], int] = {}
+        errors: list[Exception] = []
+        not_found = False
+
+        def launch() -> None:
+            if (index := next(sources, None)) is not None:
+                task = asyncio.ensure_future(self._timed(index, start(index)))
+                pending[task] = index
+
+        launch()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.strategy.hedge_delay if hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    launch()
+                    continue
+                for task in done:
+                    index = pending.pop(task)
+                    if (exc := task.exception()) is None:
+                        return index, task.result()
+                    if isinstance(exc, ObjectNotFound):
+                        not_found = True
+                    elif not isinstance(exc, NotImplementedError):
+                        errors.append(exc)  # type: ignore
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        # an answer from a healthy source is preferred over errors of the others.
+        if not_found:
+            raise ObjectNotFound
+        if errors:
+            raise errors[0]
+        raise NotImplementedError
+
+    def _wrap_coroutine(self, method: str) -> Callable[..., Any]:
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            _, result = await self._race(
+                lambda index: getattr(self.apis[index], method)(*args, **kwargs), self._order()
+            )
+            return result
+
+        return _wrapper
+
+    def _wrap_iterator(self, method: str) -> Callable[..., AsyncIterable[Any]]:
+        async def _wrapper(*args: Any, **kwargs: Any) -> AsyncIterable[Any]:
+            iterators: dict[int, AsyncIterator[Any]] = {}
+
+            def start(index: int) -> Any:
+                iterator = iterators[index] = aiter(
+                    getattr(self.apis[index], method)(*args, **kwargs)
+                )
+                return anext(iterator, _END)
+
+            # the race is decided by the first item, the rest is streamed from the winner.
+            winner: int | None = None
+            try:
+                winner, first = await self._race(start, self._order())
+            finally:
+                for index, iterator in iterators.items():
+                    if index != winner and (aclose := getattr(iterator, "aclose", None)):
+                        await aclose()
+            if first is _END:
+                return
+            yield first
+            async for model in iterators[cast(int, winner)]:
+                yield model
+
+        return _wrapper
+
+    def _wrap_methods(self) -> None:
+        for method in MasterApi.__abstractmethods__:
+            if method == "get_freshness_token":
+                continue
+            if inspect.iscoroutinefunction(getattr(MasterApi, method)):
+                setattr(self, method, self._wrap_coroutine(method))
+            else:
+                setattr(self, method, self._wrap_iterator(method))
+
+    async def get_freshness_token(self, type: type[SharedModel]) -> str | None:
+        # tokens of different sources are not comparable, so the configured order is kept
+        # without hedging, and the token is tagged with its source.
+        source, token = await self._race(
+            lambda index: self.apis[index].get_freshness_token(type),
+            list(range(len(self.apis))),
+            hedge=False,
+        )
+        return f"{source}:{token}" if token is not None else None
@@ -0,0 +1,105 @@
+import asyncio
+import contextlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from aiofile import async_open
+from pydantic import RootModel
+
+UpdateHistory = RootModel[list[datetime]]
+
+# checks are scheduled by the hour of the week, in utc.
+SLOTS = 7 * 24
+
+
+class CheckScheduler:
+    # learns the hours of the week upstream tends to update at, and checks often around them.
+    path: Path
+    check_cycle: timedelta
+    min_cycle: timedelta | None
+    max_cycle: timedelta
+    history_size: int
+    min_hits: int
+    history: list[datetime]
+    _last_check: datetime | None
+    _triggered: asyncio.Event
+
+    def __init__(
+        self,
+        path: Path,
+        check_cycle: timedelta,
+        min_cycle: timedelta | None = None,
+        max_cycle: timedelta | None = None,
+        history_size: int = 64,
+        min_hits: int = 2,
+    ) -> None:
+        self.path = path
+        self.check_cycle = check_cycle
+        self.min_cycle = min_cycle
+        self.max_cycle = max_cycle or check_cycle
+        self.history_size = history_size
+        self.min_hits = min_hits
+        self.history = []
+        self._last_check = None
+        self._triggered = asyncio.Event()
+
+    async def load(self) -> None:
+        if not self.path.exists():
+            return
+        async with async_open(self.path, "rb") as afp:
+            data = await afp.read()
+        self.history = UpdateHistory.model_validate_json(data).root
+
+    async def save(self) -> None:
+        data = UpdateHistory(root=self.history).model_dump_json()
+        async with async_open(self.path, "w") as afp:
+            await afp.write(data)
+
+    @staticmethod
+    def _slot(when: datetime) -> int:
+        when = when.astimezone(timezone.utc)
+        return when.weekday() * 24 + when.hour
+
+    def _hot_slots(self) -> set[int]:
+        # a slot is hot once updates recur in it, so a one-off update does not speed up checks.
+        hits = Counter(self._slot(when) for when in self.history)
+        # neighbouring slots are included, since updates are seen up to a check cycle late.
+        return {
+            (slot + offset) % SLOTS
+            for slot, count in hits.items()
+            if count >= self.min_hits
+            for offset in (-1, 0, 1)
+        }
+
+    def checked(self, now: datetime | None = None) -> None:
+        self._last_check = now or datetime.now(timezone.utc)
+
+    async def record_update(self, now: datetime | None = None) -> None:
+        now = now or datetime.now(timezone.utc)
+        # the update happened somewhere between the last check and now.
+        when = self._last_check + (now - self._last_check) / 2 if self._last_check else now
+        self.history = (self.history + [when])[-self.history_size :]
+        await self.save()
+
+    def next_delay(self, now: datetime | None = None) -> timedelta:
+        if self.min_cycle is None or not (hot := self._hot_slots()):
+            return self.check_cycle
+        now = now or datetime.now(timezone.utc)
+        slot = self._slot(now)
+        if slot in hot:
+            return self.min_cycle
+        distance = min((hot_slot - slot) % SLOTS for hot_slot in hot)
+        start = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=distance)
+        return min(max(start - now, self.min_cycle), self.max_cycle)
+
+    def trigger(self) -> None:
+        self._triggered.set()
+
+    async def wait(self, delay: timedelta) -> bool:
+        # returns whether the wait is ended early by a trigger.
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._triggered.wait(), delay.total_seconds())
+        triggered = self._triggered.is_set()
+        self._triggered.clear()
+        return triggered
@@ -1,11 +1,15 @@
+import asyncio
+import heapq
+import unicodedata
 from enum import IntEnum, auto
-from typing import AsyncIterable, Callable, TypeVar
+from typing import Any, AsyncIterable, Callable, Generic, Iterable, TypeVar
 
 from sekai.api.master import MasterApi
 from sekai.core.models import AnySharedModel
 from sekai.core.models.card import CardInfo
 from sekai.core.models.gacha import Gacha
 from sekai.core.models.music import MusicInfo
+from sekai.utils.bktree import BKTree
 
 _T = TypeVar("_T", bound=MasterApi)
 
@@ -14,41 +18,209 @@ class MatchMethod(IntEnum):
     FULL_MATCH = auto()
     PART_FULL_MATCH = auto()
     PART_PARTIAL_MATCH = auto()
+    # the closest results first, only available with a search index.
+    RANKED_MATCH = auto()
 
 
 DEFAULT_METHOD = MatchMethod.FULL_MATCH
 
+RANK_LIMIT = 20
+
+# katakana from ァ to ヶ, folded to the hiragana 0x60 code points before them.
+KANA_FOLDING = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def normalize(text: str) -> str:
+    # nfkc unifies half and full width forms, so the kana left to fold are all full width.
+    return unicodedata.normalize("NFKC", text).casefold().translate(KANA_FOLDING)
+
+
+def match(keywords: str, data: list[str], method: MatchMethod) -> bool:
+    match method:
+        case MatchMethod.FULL_MATCH:
+            return not set(data).difference(keywords.split())
+        case MatchMethod.PART_FULL_MATCH:
+            return bool(set(data).intersection(keywords.split()))
+        case MatchMethod.PART_PARTIAL_MATCH:
+            return all(any(keyword in part for part in data) for keyword in keywords.split())
+        case MatchMethod.RANKED_MATCH:
+            raise ValueError("ranked match needs a search index.")
+
+
+def ngrams(text: str) -> set[str]:
+    # bigrams, or the character itself for single characters, as titles have no spaces to split.
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+class SearchIndex(Generic[AnySharedModel]):
+    # maps each normalized field value to the positions of the models having it, in iteration order.
+    generation: str
+    models: list[AnySharedModel]
+    fields: list[list[str]]
+    postings: dict[str, list[int]]
+    # maps each character and bigram to the positions of the models containing it.
+    grams: dict[str, list[int]]
+    _words: BKTree[int] | None
+
+    def __init__(self, generation: str) -> None:
+        self.generation = generation
+        self.models = []
+        self.fields = []
+        self.postings = {}
+        self.grams = {}
+        self._words = None
+
+    @property
+    def words(self) -> BKTree[int]:
+        # only ranked matches need it, so it is built on the first of them.
+        if self._words is None:
+            self._words = BKTree()
+            for field, positions in self.postings.items():
+                for position in positions:
+                    self._words.add(field, position)
+        return self._words
+
+    @classmethod
+    async def build(
+        cls,
+        generation: str,
+        iterator: AsyncIterable[AnySharedModel],
+        data: Callable[[AnySharedModel], list[str]],
+    ) -> "SearchIndex[AnySharedModel]":
+        index = cls(generation)
+        async for model in iterator:
+            position = len(index.models)
+            fields = [normalize(field) for field in data(model)]
+            index.models.append(model)
+            index.fields.append(fields)
+            grams: set[str] = set()
+            for field in set(fields):
+                index.postings.setdefault(field, []).append(position)
+                grams.update(field, ngrams(field))
+            for gram in grams:
+                index.grams.setdefault(gram, []).append(position)
+        return index
+
+    def _union(self, keywords: list[str]) -> list[int]:
+        positions: set[int] = set()
+        for keyword in set(keywords):
+            positions.update(self.postings.get(keyword, []))
+        return sorted(positions)
+
+    def _candidates(self, keywords: list[str]) -> list[int]:
+        grams = {gram for keyword in keywords for gram in ngrams(keyword)}
+        if not grams:
+            return list(range(len(self.models)))
+        postings = sorted((self.grams.get(gram, []) for gram in grams), key=len)
+        positions = set(postings[0]).intersection(*postings[1:])
+        return sorted(positions)
+
+    def _rank(self, query: str, limit: int = RANK_LIMIT) -> list[int]:
+        # exact matches go first, then prefixes, substrings and typos, each by edit distance.
+        if not query:
+            return list(range(min(limit, len(self.models))))
+        scores: dict[int, tuple[int, int]] = {}
+
+        def score(position: int, tier: int, distance: int) -> None:
+            if (previous := scores.get(position)) is None or (tier, distance) < previous:
+                scores[position] = (tier, distance)
+
+        for position in self._candidates([query]):
+            for field in self.fields[position]:
+                if query in field:
+                    tier = 0 if field == query else 1 if field.startswith(query) else 2
+                    score(position, tier, len(field) - len(query))
+        # typos always rank below substrings, so they are only looked up for the rest.
+        if len(scores) < limit:
+            for distance, _, positions in self.words.search(query, max(1, len(query) // 3)):
+                for position in positions:
+                    score(position, 3, distance)
+        return heapq.nsmallest(limit, scores, key=lambda position: (*scores[position], position))
+
+    def search(self, keywords: str, method: MatchMethod) -> Iterable[AnySharedModel]:
+        keywords = normalize(keywords)
+        match method:
+            case MatchMethod.FULL_MATCH:
+                words = set(keywords.split())
+                positions = [
+                    position
+                    for position in self._union(list(words))
+                    if words.issuperset(self.fields[position])
+                ]
+            case MatchMethod.PART_FULL_MATCH:
+                positions = self._union(keywords.split())
+            case MatchMethod.PART_PARTIAL_MATCH:
+                # candidates contain every gram of the keywords, but maybe across different fields.
+                positions = [
+                    position
+                    for position in self._candidates(keywords.split())
+                    if match(keywords, self.fields[position], method)
+                ]
+            case MatchMethod.RANKED_MATCH:
+                positions = self._rank(" ".join(keywords.split()))
+        return (self.models[position] for position in positions)
+
 
 def make_master_api_search_helper(base: type[_T]):
     class MasterApiSearchHelper(base):
+        _search_indexes: dict[str, SearchIndex[Any]]
+        _search_lock: asyncio.Lock
+
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            self._search_indexes = {}
+            self._search_lock = asyncio.Lock()
+
         @staticmethod
         def match(keywords: str, data: list[str], method: MatchMethod) -> bool:
-            match method:
-                case MatchMethod.FULL_MATCH:
-                    return not set(data).difference(keywords.split())
-                case MatchMethod.PART_FULL_MATCH:
-                    return bool(set(data).intersection(keywords.split()))
-                case MatchMethod.PART_PARTIAL_MATCH:
-                    return all(
-                        any(keyword in part for part in data) for keyword in keywords.split()
+            return match(keywords, data, method)
+
+        async def _search_index(
+            self,
+            name: str,
+            iterator: Callable[[], AsyncIterable[AnySharedModel]],
+            data: Callable[[AnySharedModel], list[str]],
+        ) -> SearchIndex[AnySharedModel] | None:
+            # only cached apis tell when their data changes, so the index can be kept up to date.
+            if (generation := getattr(self, "generation", None)) is None:
+                return None
+            async with self._search_lock:
+                index = self._search_indexes.get(name)
+                if index is None or index.generation != generation:
+                    index = self._search_indexes[name] = await SearchIndex.build(
+                        generation, iterator(), data
                     )
+                return index
 
-        @staticmethod
         async def _search(
-            iterator: AsyncIterable[AnySharedModel],
+            self,
+            name: str,
+            iterator: Callable[[], AsyncIterable[AnySharedModel]],
             keywords: str,
             data: Callable[[AnySharedModel], list[str]],
             method: MatchMethod,
         ) -> AsyncIterable[AnySharedModel]:
-            async for model in iterator:
-                if MasterApiSearchHelper.match(keywords, data(model), method):
-                    yield model
+            index = await self._search_index(name, iterator, data)
+            if index is None and method == MatchMethod.RANKED_MATCH:
+                # ranking needs every record anyway, so a throwaway index is built for it.
+                index = await SearchIndex.build("", iterator(), data)
+            if index is None:
+                keywords = normalize(keywords)
+                async for model in iterator():
+                    if match(keywords, [normalize(field) for field in data(model)], method):
+                        yield model
+                return
+            for model in index.search(keywords, method):
+                yield model
 
         def search_music_info_by_title(
             self, keywords: str, method: MatchMethod = DEFAULT_METHOD
         ) -> AsyncIterable[MusicInfo]:
             return self._search(
-                super().iter_music_infos(),  # type: ignore
+                "music_title",
+                super().iter_music_infos,  # type: ignore
                 keywords,
                 lambda model: [model.title],
                 method,
@@ -58,7 +230,8 @@ def make_master_api_search_helper(base: type[_T]):
             self, keywords: str, method: MatchMethod = DEFAULT_METHOD
         ) -> AsyncIterable[MusicInfo]:
             return self._search(
-                super().iter_music_infos(),  # type: ignore
+                "music_artist",
+                super().iter_music_infos,  # type: ignore
                 keywords,
                 lambda model: [model.composer, model.lyricist, model.arranger],
                 method,
@@ -68,7 +241,8 @@ def make_master_api_search_helper(base: type[_T]):
             self, keywords: str, method: MatchMethod = DEFAULT_METHOD
         ) -> AsyncIterable[CardInfo]:
             return self._search(
-                super().iter_card_infos(),  # type: ignore
+                "card_title",
+                super().iter_card_infos,  # type: ignore
                 keywords,
                 lambda model: [model.title],
                 method,
@@ -78,7 +252,8 @@ def make_master_api_search_helper(base: type[_T]):
             self, keywords: str, method: MatchMethod = DEFAULT_METHOD
         ) -> AsyncIterable[Gacha]:
             return self._search(
-                super().iter_gachas(),  # type: ignore
+                "gacha_name",
+                super().iter_gachas,  # type: ignore
                 keywords,
                 lambda model: [model.name],
                 method,
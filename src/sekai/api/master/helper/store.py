@@ -0,0 +1,354 @@
+import abc
+import bisect
+import contextlib
+import mmap
+import os
+import shutil
+import struct
+from array import array
+from enum import IntEnum, auto
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterable, cast
+
+from aiofile import AIOFile, async_open
+from pydantic import RootModel
+
+
+class StoreFormat(IntEnum):
+    FILES = auto()
+    PACKED = auto()
+    MAPPED = auto()
+
+
+class RecordStore(abc.ABC):
+    path: Path
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def clear(self) -> None:
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self.path.mkdir(parents=True)
+
+    @abc.abstractmethod
+    def writer(self, name: str) -> contextlib.AbstractAsyncContextManager["RecordWriter"]:
+        ...
+
+    @abc.abstractmethod
+    async def read(self, name: str, id: int) -> bytes | None:
+        ...
+
+    async def read_many(self, name: str, ids: list[int]) -> dict[int, bytes]:
+        records: dict[int, bytes] = {}
+        for id in set(ids):
+            if (data := await self.read(name, id)) is not None:
+                records[id] = data
+        return records
+
+    @abc.abstractmethod
+    def iter(self, name: str) -> AsyncIterable[bytes]:
+        ...
+
+
+class RecordWriter(abc.ABC):
+    @abc.abstractmethod
+    async def write(self, id: int, data: bytes) -> None:
+        ...
+
+    async def reuse(self, source: RecordStore, name: str, id: int) -> bool:
+        # take over an unchanged record from another store without writing it again.
+        return False
+
+
+class _FileRecordWriter(RecordWriter):
+    path: Path
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    async def write(self, id: int, data: bytes) -> None:
+        async with async_open(self.path / f"{id}.json", "wb") as afp:
+            await afp.write(data)
+
+    async def reuse(self, source: RecordStore, name: str, id: int) -> bool:
+        if not isinstance(source, FileRecordStore):
+            return False
+        try:
+            os.link(source.record_path(name, id), self.path / f"{id}.json")
+        except OSError:
+            return False
+        return True
+
+
+class FileRecordStore(RecordStore):
+    def _models_path(self, name: str) -> Path:
+        return self.path / name
+
+    def record_path(self, name: str, id: int) -> Path:
+        return (self._models_path(name) / str(id)).with_suffix(".json")
+
+    @contextlib.asynccontextmanager
+    async def writer(self, name: str) -> AsyncGenerator[RecordWriter, None]:
+        path = self._models_path(name)
+        path.mkdir(exist_ok=True)
+        yield _FileRecordWriter(path)
+
+    async def read(self, name: str, id: int) -> bytes | None:
+        path = self.record_path(name, id)
+        if not path.exists():
+            return None
+        assert path.is_file(), f"{path} is not a file."
+        async with async_open(path, "rb") as afp:
+            return await afp.read()
+
+    async def iter(self, name: str) -> AsyncIterable[bytes]:
+        path = self._models_path(name)
+        if not path.exists():
+            return
+        for file in path.iterdir():
+            if file.suffix != ".json":
+                continue
+            async with async_open(file, "rb") as afp:
+                yield await afp.read()
+
+
+PackedIndex = RootModel[dict[int, tuple[int, int]]]
+
+
+class _PackedRecordWriter(RecordWriter):
+    afp: AIOFile
+    offsets: dict[int, tuple[int, int]]
+    _offset: int
+
+    def __init__(self, afp: AIOFile) -> None:
+        self.afp = afp
+        self.offsets = {}
+        self._offset = 0
+
+    async def write(self, id: int, data: bytes) -> None:
+        assert b"\n" not in data, "record should be encoded in a single line."
+        await self.afp.write(data + b"\n", self._offset)
+        self.offsets[id] = (self._offset, len(data))
+        self._offset += len(data) + 1
+
+
+class PackedRecordStore(RecordStore):
+    # records of a type are packed into a json lines file, located by an offset index.
+    _indexes: dict[str, dict[int, tuple[int, int]]]
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self._indexes = {}
+
+    def clear(self) -> None:
+        super().clear()
+        self._indexes.clear()
+
+    def _data_path(self, name: str) -> Path:
+        return (self.path / name).with_suffix(".jsonl")
+
+    def _index_path(self, name: str) -> Path:
+        return (self.path / name).with_suffix(".idx")
+
+    async def _load_index(self, name: str) -> dict[int, tuple[int, int]]:
+        if (index := self._indexes.get(name)) is not None:
+            return index
+        path = self._index_path(name)
+        if not path.exists():
+            return {}
+        async with async_open(path, "rb") as afp:
+            data = await afp.read()
+        index = self._indexes[name] = PackedIndex.model_validate_json(data).root
+        return index
+
+    @contextlib.asynccontextmanager
+    async def writer(self, name: str) -> AsyncGenerator[RecordWriter, None]:
+        async with AIOFile(self._data_path(name), "wb") as afp:
+            writer = _PackedRecordWriter(afp)
+            yield writer
+            await afp.fsync()
+        data = PackedIndex(root=writer.offsets).model_dump_json()
+        async with async_open(self._index_path(name), "w") as afp:
+            await afp.write(data)
+        self._indexes[name] = writer.offsets
+
+    async def read(self, name: str, id: int) -> bytes | None:
+        index = await self._load_index(name)
+        if (location := index.get(id)) is None:
+            return None
+        offset, length = location
+        async with AIOFile(self._data_path(name), "rb") as afp:
+            return await afp.read(length, offset)  # type: ignore
+
+    async def read_many(self, name: str, ids: list[int]) -> dict[int, bytes]:
+        index = await self._load_index(name)
+        # read in file order within a single open of the data file.
+        locations = sorted(
+            (location, id) for id in set(ids) if (location := index.get(id)) is not None
+        )
+        records: dict[int, bytes] = {}
+        if not locations:
+            return records
+        async with AIOFile(self._data_path(name), "rb") as afp:
+            for (offset, length), id in locations:
+                records[id] = await afp.read(length, offset)  # type: ignore
+        return records
+
+    async def iter(self, name: str) -> AsyncIterable[bytes]:
+        path = self._data_path(name)
+        if not path.exists():
+            return
+        async with async_open(path, "rb") as afp:
+            async for line in afp:
+                # typed as text by aiofile, but binary mode yields bytes.
+                if data := cast(bytes, line).rstrip(b"\n"):
+                    yield data
+
+
+class _MappedTable:
+    # sorted by id, so lookups can be done with binary search.
+    ids: "array[int]"
+    offsets: "array[int]"
+    lengths: "array[int]"
+
+    HEADER = struct.Struct("<Q")
+
+    def __init__(self, ids: "array[int]", offsets: "array[int]", lengths: "array[int]") -> None:
+        self.ids = ids
+        self.offsets = offsets
+        self.lengths = lengths
+
+    @classmethod
+    def from_offsets(cls, offsets: dict[int, tuple[int, int]]) -> "_MappedTable":
+        items = sorted(offsets.items())
+        return cls(
+            array("q", (id for id, _ in items)),
+            array("Q", (offset for _, (offset, _) in items)),
+            array("Q", (length for _, (_, length) in items)),
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "_MappedTable":
+        (count,) = cls.HEADER.unpack_from(data)
+        arrays: list[array[int]] = []
+        offset = cls.HEADER.size
+        for typecode in ("q", "Q", "Q"):
+            arr = array(typecode)
+            size = arr.itemsize * count
+            arr.frombytes(data[offset : offset + size])
+            arrays.append(arr)
+            offset += size
+        return cls(*arrays)
+
+    def to_bytes(self) -> bytes:
+        return b"".join(
+            [
+                self.HEADER.pack(len(self.ids)),
+                self.ids.tobytes(),
+                self.offsets.tobytes(),
+                self.lengths.tobytes(),
+            ]
+        )
+
+    def find(self, id: int) -> tuple[int, int] | None:
+        index = bisect.bisect_left(self.ids, id)
+        if index == len(self.ids) or self.ids[index] != id:
+            return None
+        return self.offsets[index], self.lengths[index]
+
+
+class MappedRecordStore(PackedRecordStore):
+    # maps the packed data file into memory, so processes share one copy in the page cache.
+    # reads copy out only the records asked for, as views would keep the map from closing.
+    _tables: dict[str, _MappedTable]
+    _maps: dict[str, mmap.mmap | None]
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self._tables = {}
+        self._maps = {}
+
+    def close(self) -> None:
+        for mapped in self._maps.values():
+            if mapped is not None:
+                mapped.close()
+        self._maps.clear()
+        self._tables.clear()
+
+    def clear(self) -> None:
+        self.close()
+        super().clear()
+
+    def _table_path(self, name: str) -> Path:
+        return (self.path / name).with_suffix(".tbl")
+
+    async def _load_table(self, name: str) -> _MappedTable | None:
+        if (table := self._tables.get(name)) is not None:
+            return table
+        path = self._table_path(name)
+        if not path.exists():
+            return None
+        async with async_open(path, "rb") as afp:
+            data = await afp.read()
+        table = self._tables[name] = _MappedTable.from_bytes(data)
+        return table
+
+    def _map(self, name: str) -> mmap.mmap | None:
+        if name in self._maps:
+            return self._maps[name]
+        path = self._data_path(name)
+        mapped = None
+        if path.exists() and path.stat().st_size:
+            with open(path, "rb") as fp:
+                mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[name] = mapped
+        return mapped
+
+    @contextlib.asynccontextmanager
+    async def writer(self, name: str) -> AsyncGenerator[RecordWriter, None]:
+        async with super().writer(name) as writer:
+            yield writer
+        table = _MappedTable.from_offsets(self._indexes[name])
+        async with async_open(self._table_path(name), "wb") as afp:
+            await afp.write(table.to_bytes())
+        self._tables[name] = table
+
+    async def read(self, name: str, id: int) -> bytes | None:
+        table = await self._load_table(name)
+        if table is None or (location := table.find(id)) is None:
+            return None
+        if (mapped := self._map(name)) is None:
+            return None
+        offset, length = location
+        return mapped[offset : offset + length]
+
+    async def read_many(self, name: str, ids: list[int]) -> dict[int, bytes]:
+        table = await self._load_table(name)
+        if table is None or (mapped := self._map(name)) is None:
+            return {}
+        records: dict[int, bytes] = {}
+        for id in set(ids):
+            if (location := table.find(id)) is not None:
+                offset, length = location
+                records[id] = mapped[offset : offset + length]
+        return records
+
+    async def iter(self, name: str) -> AsyncIterable[bytes]:
+        if (mapped := self._map(name)) is None:
+            return
+        start = 0
+        while (end := mapped.find(b"\n", start)) != -1:
+            if end > start:
+                yield mapped[start:end]
+            start = end + 1
+
+
+def make_record_store(format: StoreFormat, path: Path) -> RecordStore:
+    match format:
+        case StoreFormat.FILES:
+            return FileRecordStore(path)
+        case StoreFormat.PACKED:
+            return PackedRecordStore(path)
+        case StoreFormat.MAPPED:
+            return MappedRecordStore(path)
@@ -1,9 +1,12 @@
+import asyncio
+from collections import deque
 from typing import Any, AsyncIterable, cast
 
 from aiohttp import ClientSession
 
 from sekai.api.exc import ObjectNotFound
 from sekai.api.master import MasterApi
+from sekai.core.models import SharedModel
 from sekai.core.models.card import CardInfo
 from sekai.core.models.chara import Character, CharacterInfo, CharacterType, ExtraCharacter
 from sekai.core.models.chara import GameCharacter as SharedGameCharacter
@@ -11,6 +14,7 @@ from sekai.core.models.gacha import Gacha as SharedGacha
 from sekai.core.models.live import LiveInfo
 from sekai.core.models.music import MusicInfo, MusicVersion
 from sekai.core.models.system import SystemInfo as SharedSystemInfo
+from sekai.utils.http import SessionPool
 
 from .._models import AnyModel
 from .._models.card import Card
@@ -18,26 +22,54 @@ from .._models.chara import GameCharacter, OutsideCharacter
 from .._models.gacha import Gacha
 from .._models.music import Music, MusicDifficulty, MusicVocal
 from .._models.system import SystemInfo
+from ..helper.chara import lookup_character_infos
 from ._models import BaseResponse
 
 DEFAULT_API = "https://api.pjsek.ai"
 
+DEFAULT_PAGE_SIZE = 20
+
+DEFAULT_CONCURRENCY = 4
+
 
 class PjsekaiApi(MasterApi):
     _api: str
+    _pool: SessionPool
+    _page_size: int
+    _concurrency: int
 
-    def __init__(self, api: str | None = None) -> None:
+    def __init__(
+        self,
+        api: str | None = None,
+        pool: SessionPool | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        assert page_size > 0 and concurrency > 0, "page size and concurrency should be positive."
         self._api = api or DEFAULT_API
+        self._pool = pool or SessionPool()
+        self._page_size = page_size
+        self._concurrency = concurrency
 
     @property
     def session(self) -> ClientSession:
-        return ClientSession(self._api)
+        return self._pool.session(self._api)
+
+    async def _page(
+        self, path: str, type: type[AnyModel], limit: int, skip: int, params: dict[str, Any]
+    ) -> BaseResponse[AnyModel]:
+        async with self.session.get(
+            path, params=({"$limit": limit, "$skip": skip} | params)
+        ) as response:
+            resp_type = cast(BaseResponse[AnyModel], BaseResponse.__class_getitem__(type))
+            json = await response.read()
+            return resp_type.model_validate_json(json)
 
     async def _iter(
         self,
         path: str,
         type: type[AnyModel],
-        limit: int = 20,
+        limit: int | None = None,
         skip: int = 0,
         params: dict[str, Any] | None = None,
     ) -> AsyncIterable[AnyModel]:
@@ -45,33 +77,55 @@ class PjsekaiApi(MasterApi):
         assert (
             "$limit" not in params and "$skip" not in params
         ), "'$limit' and '$skip' should not be in the params."
-        while True:
-            async with self.session as session:
-                async with session.get(
-                    path, params=({"$limit": limit, "$skip": skip} | params)
-                ) as response:
-                    resp_type = cast(BaseResponse[AnyModel], BaseResponse.__class_getitem__(type))
-                    json = await response.read()
-                    data = resp_type.model_validate_json(json)
-                    for model in data.data:
-                        yield model
-                    if data.skip + data.limit >= data.total:
-                        return
-            skip += limit
+        limit = limit or self._page_size
+        data = await self._page(path, type, limit, skip, params)
+        for model in data.data:
+            yield model
+        # the server may cap the page size, so the following pages follow the actual limit.
+        limit = data.limit or limit
+        skips = iter(range(data.skip + limit, data.total, limit))
+        # pages are fetched ahead in a bounded window, and yielded in order.
+        pending: deque[asyncio.Task[BaseResponse[AnyModel]]] = deque()
+        try:
+            while True:
+                while len(pending) < self._concurrency and (page := next(skips, None)) is not None:
+                    pending.append(asyncio.create_task(self._page(path, type, limit, page, params)))
+                if not pending:
+                    return
+                data = await pending.popleft()
+                for model in data.data:
+                    yield model
+        finally:
+            for task in pending:
+                task.cancel()
+            # pages fetched ahead are awaited, so their cancellations and failures are retrieved.
+            await asyncio.gather(*pending, return_exceptions=True)
 
     async def _get(
         self, path: str, type: type[AnyModel], *args: Any, **kwargs: Any
     ) -> list[AnyModel]:
-        async with self.session as session:
-            async with session.get(path, *args, **kwargs) as response:
-                resp_type = cast(BaseResponse[AnyModel], BaseResponse.__class_getitem__(type))
-                json = await response.read()
-                data = resp_type.model_validate_json(json)
-                if not data.data:
-                    raise ObjectNotFound
-                return data.data
-
-    async def iter_card_infos(self, limit: int = 20, skip: int = 0) -> AsyncIterable[CardInfo]:
+        async with self.session.get(path, *args, **kwargs) as response:
+            resp_type = cast(BaseResponse[AnyModel], BaseResponse.__class_getitem__(type))
+            json = await response.read()
+            data = resp_type.model_validate_json(json)
+            if not data.data:
+                raise ObjectNotFound
+            return data.data
+
+    async def _get_many(self, path: str, type: type[AnyModel], ids: list[int]) -> list[AnyModel]:
+        if not (unique := sorted(set(ids))):
+            return []
+        models: dict[int, AnyModel] = {
+            cast(Any, model).id: model
+            async for model in self._iter(path, type, len(unique), params={"id[$in][]": unique})
+        }
+        if not models.keys() >= set(unique):
+            raise ObjectNotFound
+        return [models[id] for id in ids]
+
+    async def iter_card_infos(
+        self, limit: int | None = None, skip: int = 0
+    ) -> AsyncIterable[CardInfo]:
         async for model in self._iter("/database/master/cards", Card, limit, skip):
             yield model.to_shared_model()
 
@@ -79,11 +133,15 @@ class PjsekaiApi(MasterApi):
         models = await self._get("/database/master/cards", Card, params={"id": id})
         return models[0].to_shared_model()
 
+    async def get_card_infos(self, ids: list[int]) -> list[CardInfo]:
+        models = await self._get_many("/database/master/cards", Card, ids)
+        return [model.to_shared_model() for model in models]
+
     def search_card_info_by_title(self, keywords: str) -> AsyncIterable[CardInfo]:
         raise NotImplementedError
 
     async def iter_game_characters(
-        self, limit: int = 20, skip: int = 0
+        self, limit: int | None = None, skip: int = 0
     ) -> AsyncIterable[SharedGameCharacter]:
         async for model in self._iter(
             "/database/master/gameCharacters", GameCharacter, limit, skip
@@ -96,8 +154,12 @@ class PjsekaiApi(MasterApi):
         )
         return models[0].to_shared_model()
 
+    async def get_game_characters(self, ids: list[int]) -> list[SharedGameCharacter]:
+        models = await self._get_many("/database/master/gameCharacters", GameCharacter, ids)
+        return [model.to_shared_model() for model in models]
+
     async def iter_extra_characters(
-        self, limit: int = 20, skip: int = 0
+        self, limit: int | None = None, skip: int = 0
     ) -> AsyncIterable[ExtraCharacter]:
         async for model in self._iter(
             "/database/master/outsideCharacters", OutsideCharacter, limit, skip
@@ -110,6 +172,10 @@ class PjsekaiApi(MasterApi):
         )
         return models[0].to_shared_model()
 
+    async def get_extra_characters(self, ids: list[int]) -> list[ExtraCharacter]:
+        models = await self._get_many("/database/master/outsideCharacters", OutsideCharacter, ids)
+        return [model.to_shared_model() for model in models]
+
     async def get_character_info(self, character: Character) -> CharacterInfo:
         match character.type:
             case CharacterType.GAME:
@@ -117,15 +183,20 @@ class PjsekaiApi(MasterApi):
             case CharacterType.EXTRA:
                 return await self.get_extra_character(character.id)
 
+    async def get_character_infos(self, characters: list[Character]) -> list[CharacterInfo]:
+        return await lookup_character_infos(self, characters)
+
     async def iter_character_infos(
-        self, limit: int = 20, skip: int = 0
+        self, limit: int | None = None, skip: int = 0
     ) -> AsyncIterable[CharacterInfo]:
         async for model in self.iter_game_characters(limit, skip):
             yield model
         async for model in self.iter_extra_characters(limit, skip):
             yield model
 
-    async def iter_music_infos(self, limit: int = 20, skip: int = 0) -> AsyncIterable[MusicInfo]:
+    async def iter_music_infos(
+        self, limit: int | None = None, skip: int = 0
+    ) -> AsyncIterable[MusicInfo]:
         async for model in self._iter("/database/master/musics", Music, limit, skip):
             yield model.to_shared_model()
 
@@ -137,7 +208,7 @@ class PjsekaiApi(MasterApi):
         raise NotImplementedError
 
     async def iter_music_versions(
-        self, limit: int = 20, skip: int = 0
+        self, limit: int | None = None, skip: int = 0
     ) -> AsyncIterable[MusicVersion]:
         async for model in self._iter("/database/master/musicVocals", MusicVocal, limit, skip):
             yield model.to_shared_model()
@@ -147,7 +218,7 @@ class PjsekaiApi(MasterApi):
         return models[0].to_shared_model()
 
     async def iter_versions_of_music(
-        self, id: int, limit: int = 20, skip: int = 0
+        self, id: int, limit: int | None = None, skip: int = 0
     ) -> AsyncIterable[MusicVersion]:
         async for vocal in self._iter(
             "/database/master/musicVocals",
@@ -158,7 +229,9 @@ class PjsekaiApi(MasterApi):
         ):
             yield vocal.to_shared_model()
 
-    async def iter_live_infos(self, limit: int = 20, skip: int = 0) -> AsyncIterable[LiveInfo]:
+    async def iter_live_infos(
+        self, limit: int | None = None, skip: int = 0
+    ) -> AsyncIterable[LiveInfo]:
         async for model in self._iter(
             "/database/master/musicDifficulties", MusicDifficulty, limit, skip
         ):
@@ -171,7 +244,7 @@ class PjsekaiApi(MasterApi):
         return models[0].to_shared_model()
 
     async def iter_live_infos_of_music(
-        self, id: int, limit: int = 20, skip: int = 0
+        self, id: int, limit: int | None = None, skip: int = 0
     ) -> AsyncIterable[LiveInfo]:
         async for vocal in self._iter(
             "/database/master/musicDifficulties",
@@ -186,7 +259,13 @@ class PjsekaiApi(MasterApi):
         models = await self._get("/system-info", SystemInfo)
         return models[0].to_shared_model()
 
-    async def iter_gachas(self, limit: int = 20, skip: int = 0) -> AsyncIterable[SharedGacha]:
+    async def get_freshness_token(self, type: type[SharedModel]) -> str | None:
+        # the api exposes no validators, and record counts miss records edited in place.
+        return None
+
+    async def iter_gachas(
+        self, limit: int | None = None, skip: int = 0
+    ) -> AsyncIterable[SharedGacha]:
         async for model in self._iter("/database/master/gachas", Gacha, limit, skip):
             yield model.to_shared_model()
 
@@ -1,10 +1,17 @@
-from typing import AsyncIterable, cast
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, cast
 
 from aiohttp import ClientSession
 from pydantic import RootModel
 
 from sekai.api.exc import ObjectNotFound
 from sekai.api.master import MasterApi
+from sekai.core.models import SharedModel, ToSharedModel
 from sekai.core.models.card import CardInfo
 from sekai.core.models.chara import Character, CharacterInfo, CharacterType, ExtraCharacter
 from sekai.core.models.chara import GameCharacter as SharedGameCharacter
@@ -12,6 +19,8 @@ from sekai.core.models.gacha import Gacha as SharedGacha
 from sekai.core.models.live import LiveInfo
 from sekai.core.models.music import MusicInfo, MusicVersion
 from sekai.core.models.system import SystemInfo as SharedSystemInfo
+from sekai.utils.http import DEFAULT_CHUNK_SIZE, ResponseCache, SessionPool
+from sekai.utils.jsonstream import ArrayItemSplitter
 
 from .._models import AnyModel
 from .._models.card import Card
@@ -19,72 +28,161 @@ from .._models.chara import GameCharacter, OutsideCharacter
 from .._models.gacha import Gacha
 from .._models.music import Music, MusicDifficulty, MusicVocal
 from .._models.system import SystemInfo
+from ..helper.chara import lookup_character_infos
 
 DEFAULT_API = "https://sekai-world.github.io"
 
+DEFAULT_TABLE_TTL = timedelta(minutes=10)
+
+MASTER_FILES: dict[type[SharedModel], str] = {
+    CardInfo: "/sekai-master-db-diff/cards.json",
+    SharedGameCharacter: "/sekai-master-db-diff/gameCharacters.json",
+    ExtraCharacter: "/sekai-master-db-diff/outsideCharacters.json",
+    MusicInfo: "/sekai-master-db-diff/musics.json",
+    MusicVersion: "/sekai-master-db-diff/musicVocals.json",
+    LiveInfo: "/sekai-master-db-diff/musicDifficulties.json",
+    SharedGacha: "/sekai-master-db-diff/gachas.json",
+}
+
+
+@dataclass
+class _Table:
+    models: dict[int, Any]
+    validator: str | None
+    expiry: float
+
 
 class SekaiWorldApi(MasterApi):
     _api: str
-
-    def __init__(self, api: str | None = None) -> None:
+    _responses: ResponseCache | None
+    _pool: SessionPool
+    _table_ttl: timedelta
+    _tables: dict[str, _Table]
+    _table_locks: defaultdict[str, asyncio.Lock]
+
+    def __init__(
+        self,
+        api: str | None = None,
+        response_cache_path: Path | None = None,
+        pool: SessionPool | None = None,
+        table_ttl: timedelta = DEFAULT_TABLE_TTL,
+    ) -> None:
         self._api = api or DEFAULT_API
+        self._responses = ResponseCache(response_cache_path) if response_cache_path else None
+        self._pool = pool or SessionPool()
+        self._table_ttl = table_ttl
+        self._tables = {}
+        self._table_locks = defaultdict(asyncio.Lock)
 
     @property
     def session(self) -> ClientSession:
-        return ClientSession(self._api)
-
-    async def _iter(self, path: str, type: type[AnyModel]) -> list[AnyModel]:
-        async with self.session as session:
-            async with session.get(path) as response:
-                resp_type = cast(
-                    RootModel[list[AnyModel]], RootModel[list[AnyModel]].__class_getitem__(type)
-                )
-                json = await response.read()
-                data = resp_type.model_validate_json(json)
-                return data.root
+        return self._pool.session(self._api)
+
+    async def _fetch(self, path: str) -> bytes:
+        session = self.session
+        if self._responses:
+            return await self._responses.fetch(session, path)
+        async with session.get(path) as response:
+            return await response.read()
+
+    async def _chunks(self, path: str) -> AsyncIterator[bytes]:
+        session = self.session
+        if self._responses:
+            async for chunk in self._responses.stream(session, path):
+                yield chunk
+            return
+        async with session.get(path) as response:
+            async for chunk in response.content.iter_chunked(DEFAULT_CHUNK_SIZE):
+                yield chunk
+
+    async def _iter(self, path: str, type: type[AnyModel]) -> AsyncIterator[AnyModel]:
+        # models are decoded as their items arrive, instead of holding the whole file in memory.
+        splitter = ArrayItemSplitter()
+        async for chunk in self._chunks(path):
+            for item in splitter.feed(chunk):
+                yield type.model_validate_json(item)
+        splitter.close()
 
     async def _get(self, path: str, type: type[AnyModel]) -> AnyModel:
-        async with self.session as session:
-            async with session.get(path) as response:
-                resp_type = cast(RootModel[AnyModel], RootModel.__class_getitem__(type))
-                json = await response.read()
-                data = resp_type.model_validate_json(json)
-                return data.root
+        resp_type = cast(RootModel[AnyModel], RootModel.__class_getitem__(type))
+        json = await self._fetch(path)
+        data = resp_type.model_validate_json(json)
+        return data.root
+
+    async def _validator(self, path: str) -> str | None:
+        async with self.session.head(path) as response:
+            return response.headers.get("ETag") or response.headers.get("Last-Modified")
+
+    async def _table(self, path: str, type: type[AnyModel]) -> dict[int, Any]:
+        async with self._table_locks[path]:
+            now = time.monotonic()
+            table = self._tables.get(path)
+            if table and now < table.expiry:
+                return table.models
+            # the table is kept after expiry as long as the file is not modified.
+            validator = await self._validator(path)
+            if table and validator is not None and validator == table.validator:
+                table.expiry = now + self._table_ttl.total_seconds()
+                return table.models
+            models = [
+                cast(ToSharedModel[Any], model).to_shared_model()
+                async for model in self._iter(path, type)
+            ]
+            table = self._tables[path] = _Table(
+                {model.id: model for model in models},
+                validator,
+                now + self._table_ttl.total_seconds(),
+            )
+            return table.models
+
+    async def _lookup(self, path: str, type: type[AnyModel], id: int) -> Any:
+        table = await self._table(path, type)
+        if (model := table.get(id)) is None:
+            raise ObjectNotFound
+        return model
+
+    async def _lookup_many(self, path: str, type: type[AnyModel], ids: list[int]) -> list[Any]:
+        if not ids:
+            return []
+        table = await self._table(path, type)
+        if not table.keys() >= set(ids):
+            raise ObjectNotFound
+        return [table[id] for id in ids]
 
     async def iter_card_infos(self) -> AsyncIterable[CardInfo]:
-        for model in await self._iter("/sekai-master-db-diff/cards.json", Card):
+        async for model in self._iter("/sekai-master-db-diff/cards.json", Card):
             yield model.to_shared_model()
 
     async def get_card_info(self, id: int) -> CardInfo:
-        async for model in self.iter_card_infos():
-            if model.id == id:
-                return model
-        raise ObjectNotFound
+        return await self._lookup(MASTER_FILES[CardInfo], Card, id)
+
+    async def get_card_infos(self, ids: list[int]) -> list[CardInfo]:
+        return await self._lookup_many(MASTER_FILES[CardInfo], Card, ids)
 
     def search_card_info_by_title(self, keywords: str) -> AsyncIterable[CardInfo]:
         raise NotImplementedError
 
     async def iter_game_characters(self) -> AsyncIterable[SharedGameCharacter]:
-        for model in await self._iter("/sekai-master-db-diff/gameCharacters.json", GameCharacter):
+        async for model in self._iter("/sekai-master-db-diff/gameCharacters.json", GameCharacter):
             yield model.to_shared_model()
 
     async def get_game_character(self, id: int) -> SharedGameCharacter:
-        async for model in self.iter_game_characters():
-            if model.id == id:
-                return model
-        raise ObjectNotFound
+        return await self._lookup(MASTER_FILES[SharedGameCharacter], GameCharacter, id)
+
+    async def get_game_characters(self, ids: list[int]) -> list[SharedGameCharacter]:
+        return await self._lookup_many(MASTER_FILES[SharedGameCharacter], GameCharacter, ids)
 
     async def iter_extra_characters(self) -> AsyncIterable[ExtraCharacter]:
-        for model in await self._iter(
+        async for model in self._iter(
             "/sekai-master-db-diff/outsideCharacters.json", OutsideCharacter
         ):
             yield model.to_shared_model()
 
     async def get_extra_character(self, id: int) -> ExtraCharacter:
-        async for model in self.iter_extra_characters():
-            if model.id == id:
-                return model
-        raise ObjectNotFound
+        return await self._lookup(MASTER_FILES[ExtraCharacter], OutsideCharacter, id)
+
+    async def get_extra_characters(self, ids: list[int]) -> list[ExtraCharacter]:
+        return await self._lookup_many(MASTER_FILES[ExtraCharacter], OutsideCharacter, ids)
 
     async def get_character_info(self, character: Character) -> CharacterInfo:
         match character.type:
@@ -93,6 +191,9 @@ class SekaiWorldApi(MasterApi):
             case CharacterType.EXTRA:
                 return await self.get_extra_character(character.id)
 
+    async def get_character_infos(self, characters: list[Character]) -> list[CharacterInfo]:
+        return await lookup_character_infos(self, characters)
+
     async def iter_character_infos(self) -> AsyncIterable[CharacterInfo]:
         async for model in self.iter_game_characters():
             yield model
@@ -100,27 +201,21 @@ class SekaiWorldApi(MasterApi):
             yield model
 
     async def iter_music_infos(self) -> AsyncIterable[MusicInfo]:
-        for model in await self._iter("/sekai-master-db-diff/musics.json", Music):
+        async for model in self._iter("/sekai-master-db-diff/musics.json", Music):
             yield model.to_shared_model()
 
     async def get_music_info(self, id: int) -> MusicInfo:
-        async for model in self.iter_music_infos():
-            if model.id == id:
-                return model
-        raise ObjectNotFound
+        return await self._lookup(MASTER_FILES[MusicInfo], Music, id)
 
     def search_music_info_by_title(self, keywords: str) -> AsyncIterable[MusicInfo]:
         raise NotImplementedError
 
     async def iter_music_versions(self) -> AsyncIterable[MusicVersion]:
-        for model in await self._iter("/sekai-master-db-diff/musicVocals.json", MusicVocal):
+        async for model in self._iter("/sekai-master-db-diff/musicVocals.json", MusicVocal):
             yield model.to_shared_model()
 
     async def get_music_version(self, id: int) -> MusicVersion:
-        async for model in self.iter_music_versions():
-            if model.id == id:
-                return model
-        raise ObjectNotFound
+        return await self._lookup(MASTER_FILES[MusicVersion], MusicVocal, id)
 
     async def iter_versions_of_music(self, id: int) -> AsyncIterable[MusicVersion]:
         async for model in self.iter_music_versions():
@@ -129,16 +224,13 @@ class SekaiWorldApi(MasterApi):
         raise ObjectNotFound
 
     async def iter_live_infos(self) -> AsyncIterable[LiveInfo]:
-        for model in await self._iter(
+        async for model in self._iter(
             "/sekai-master-db-diff/musicDifficulties.json", MusicDifficulty
         ):
             yield model.to_shared_model()
 
     async def get_live_info(self, id: int) -> LiveInfo:
-        async for model in self.iter_live_infos():
-            if model.id == id:
-                return model
-        raise ObjectNotFound
+        return await self._lookup(MASTER_FILES[LiveInfo], MusicDifficulty, id)
 
     async def iter_live_infos_of_music(self, id: int) -> AsyncIterable[LiveInfo]:
         async for model in self.iter_live_infos():
@@ -150,15 +242,17 @@ class SekaiWorldApi(MasterApi):
         info = await self._get("/sekai-master-db-diff/versions.json", SystemInfo)
         return info.to_shared_model()
 
+    async def get_freshness_token(self, type: type[SharedModel]) -> str | None:
+        if not (path := MASTER_FILES.get(type)):
+            return None
+        return await self._validator(path)
+
     async def iter_gachas(self) -> AsyncIterable[SharedGacha]:
-        for model in await self._iter("/sekai-master-db-diff/gachas.json", Gacha):
+        async for model in self._iter("/sekai-master-db-diff/gachas.json", Gacha):
             yield model.to_shared_model()
 
     async def get_gacha(self, id: int) -> SharedGacha:
-        async for model in self.iter_gachas():
-            if model.id == id:
-                return model
-        raise ObjectNotFound
+        return await self._lookup(MASTER_FILES[SharedGacha], Gacha, id)
 
     def search_gacha_by_name(self, keywords: str) -> AsyncIterable[SharedGacha]:
         raise NotImplementedError
@@ -1,4 +1,4 @@
-from typing import cast
+from typing import TypeVar, cast
 
 from sekai.core.models import ToSharedModel
 from sekai.core.models.card import Card, Deck
@@ -141,24 +141,9 @@ class UserStoryFavorite(BaseSchema):
     pass
 
 
-class Profile(BaseSchema):
-    total_power: TotalPower
+class UserInfoSection(BaseSchema):
     user: User
-    user_bonds_honors: list[UserBondsHonor]
-    user_cards: list[UserCard]
-    # user_challenge_live_solo_result can be not existed
-    user_challenge_live_solo_result: UserChallengeLiveSoloResult | None = None
-    user_challenge_live_solo_stages: list[UserChallengeLiveSoloStage]
-    user_config: UserConfig
-    user_custom_profile_cards: list[UserCustomProfileCard]
-    user_deck: UserDeck
-    user_honor_missions: list[UserHonorMission]
-    user_honors: list[UserHonor]
-    user_multi_live_top_score_count: UserMultiLiveTopScoreCount
-    user_music_difficulty_clear_count: list[UserMusicDifficultyClearCount]
     user_profile: UserProfile
-    user_profile_honors: list[UserProfileHonor]
-    user_story_favorites: list[UserStoryFavorite]
 
     def to_user_info(self) -> UserInfo:
         profile = SharedProfile(
@@ -169,10 +154,17 @@ class Profile(BaseSchema):
             profile=profile,
         )
 
+
+class DeckSection(BaseSchema):
+    total_power: TotalPower
+    user_cards: list[UserCard]
+    user_deck: UserDeck
+
     def to_deck(self) -> Deck:
-        cards = [card.to_shared_model() for card in self.user_cards]
         members = tuple(
-            iters.first(cards, lambda card: card.id == getattr(self.user_deck, f"member{i}"))
+            iters.first(
+                self.user_cards, lambda card: card.card_id == getattr(self.user_deck, f"member{i}")
+            ).to_shared_model()
             for i in range(1, 6)
         )
         return Deck(
@@ -184,6 +176,12 @@ class Profile(BaseSchema):
             total_power=self.total_power.to_shared_model(),
         )
 
+
+class AchievementSection(BaseSchema):
+    user: User
+    user_multi_live_top_score_count: UserMultiLiveTopScoreCount
+    user_music_difficulty_clear_count: list[UserMusicDifficultyClearCount]
+
     def to_achievement(self) -> Achievement:
         live_clears: dict[LiveDifficulty, int] = {}
         full_combos: dict[LiveDifficulty, int] = {}
@@ -203,3 +201,45 @@ class Profile(BaseSchema):
             live=live,
             multilive=self.user_multi_live_top_score_count.to_shared_model(),
         )
+
+
+class Profile(UserInfoSection, DeckSection, AchievementSection):
+    user_bonds_honors: list[UserBondsHonor]
+    # user_challenge_live_solo_result can be not existed
+    user_challenge_live_solo_result: UserChallengeLiveSoloResult | None = None
+    user_challenge_live_solo_stages: list[UserChallengeLiveSoloStage]
+    user_config: UserConfig
+    user_custom_profile_cards: list[UserCustomProfileCard]
+    user_honor_missions: list[UserHonorMission]
+    user_honors: list[UserHonor]
+    user_profile_honors: list[UserProfileHonor]
+    user_story_favorites: list[UserStoryFavorite]
+
+
+_Section = TypeVar("_Section", bound=BaseSchema)
+
+
+class LazyProfile:
+    # keeps the raw document, and validates only the section a conversion needs on first use.
+    data: bytes
+    _sections: dict[type[BaseSchema], BaseSchema]
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self._sections = {}
+        # every profile is shown with its user info, so a malformed document fails here already.
+        self._section(UserInfoSection)
+
+    def _section(self, type: type[_Section]) -> _Section:
+        if (section := self._sections.get(type)) is None:
+            section = self._sections[type] = type.model_validate_json(self.data)
+        return cast(_Section, section)
+
+    def to_user_info(self) -> UserInfo:
+        return self._section(UserInfoSection).to_user_info()
+
+    def to_deck(self) -> Deck:
+        return self._section(DeckSection).to_deck()
+
+    def to_achievement(self) -> Achievement:
+        return self._section(AchievementSection).to_achievement()
@@ -0,0 +1,146 @@
+import asyncio
+import functools
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from aiofile import async_open
+
+from sekai.utils.ratelimit import Priority, request_priority
+
+_T = TypeVar("_T")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProfileCacheStrategy:
+    max_size: int = 1024
+    # entries younger than this are served as they are.
+    ttl: timedelta = timedelta(minutes=3)
+    # older entries are still served within this age, while being refreshed in background.
+    stale_ttl: timedelta = timedelta(days=1)
+
+
+@dataclass
+class _Entry(Generic[_T]):
+    value: _T
+    data: bytes
+    fetched: float
+
+
+class ProfileCache(Generic[_T]):
+    strategy: ProfileCacheStrategy
+    path: Path | None
+    _fetch: Callable[[int], Awaitable[bytes]]
+    _decode: Callable[[bytes], _T]
+    _entries: OrderedDict[int, _Entry[_T]]
+    _refreshes: dict[int, asyncio.Task[_Entry[_T]]]
+
+    def __init__(
+        self,
+        fetch: Callable[[int], Awaitable[bytes]],
+        decode: Callable[[bytes], _T],
+        strategy: ProfileCacheStrategy | None = None,
+        path: Path | None = None,
+    ) -> None:
+        self.strategy = strategy or ProfileCacheStrategy()
+        self.path = path
+        self._fetch = fetch
+        self._decode = decode
+        self._entries = OrderedDict()
+        self._refreshes = {}
+        if self.path:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._prune()
+
+    def _prune(self) -> None:
+        # entries left by earlier runs count against the size as well.
+        assert self.path
+        files = sorted(self.path.glob("*.json"), key=lambda file: file.stat().st_mtime)
+        for file in files[: max(0, len(files) - self.strategy.max_size)]:
+            file.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry_path(self, id: int) -> Path:
+        assert self.path
+        return (self.path / str(id)).with_suffix(".json")
+
+    async def _load(self, id: int) -> _Entry[_T] | None:
+        if not self.path or not (path := self._entry_path(id)).exists():
+            return None
+        async with async_open(path, "rb") as afp:
+            data = await afp.read()
+        try:
+            value = self._decode(data)
+        except ValueError:
+            # left by an earlier version or a broken write, it is fetched again.
+            logger.warning(f"dropping unreadable cached profile {id}.", exc_info=True)
+            path.unlink(missing_ok=True)
+            return None
+        return _Entry(value, data, path.stat().st_mtime)
+
+    async def _save(self, id: int, entry: _Entry[_T]) -> None:
+        if not self.path:
+            return
+        path = self._entry_path(id)
+        async with async_open(path, "wb") as afp:
+            await afp.write(entry.data)
+        os.utime(path, (entry.fetched, entry.fetched))
+
+    def _put(self, id: int, entry: _Entry[_T]) -> None:
+        self._entries[id] = entry
+        self._entries.move_to_end(id)
+        while len(self._entries) > self.strategy.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            if self.path:
+                self._entry_path(evicted).unlink(missing_ok=True)
+
+    async def _do_refresh(self, id: int) -> _Entry[_T]:
+        data = await self._fetch(id)
+        entry = _Entry(self._decode(data), data, time.time())
+        self._put(id, entry)
+        await self._save(id, entry)
+        return entry
+
+    def _refreshed(self, id: int, task: asyncio.Task[_Entry[_T]]) -> None:
+        self._refreshes.pop(id, None)
+        if task.cancelled() or (exc := task.exception()) is None:
+            return
+        if id in self._entries:
+            logger.warning(f"failed to refresh profile {id}, serving the stale one.", exc_info=exc)
+
+    def _refresh(self, id: int) -> asyncio.Task[_Entry[_T]]:
+        # concurrent refreshes of the same profile share one fetch.
+        if (task := self._refreshes.get(id)) is None:
+            task = self._refreshes[id] = asyncio.create_task(self._do_refresh(id))
+            task.add_done_callback(functools.partial(self._refreshed, id))
+        return task
+
+    def invalidate(self, id: int) -> None:
+        self._entries.pop(id, None)
+        if self.path:
+            self._entry_path(id).unlink(missing_ok=True)
+
+    async def get(self, id: int) -> _T:
+        entry = self._entries.get(id)
+        if entry is None and (entry := await self._load(id)) is not None:
+            self._put(id, entry)
+        if entry is None:
+            return (await asyncio.shield(self._refresh(id))).value
+        self._entries.move_to_end(id)
+        age = time.time() - entry.fetched
+        if age < self.strategy.ttl.total_seconds():
+            return entry.value
+        if age < self.strategy.stale_ttl.total_seconds():
+            with request_priority(Priority.BACKGROUND):
+                self._refresh(id)
+            return entry.value
+        return (await asyncio.shield(self._refresh(id))).value
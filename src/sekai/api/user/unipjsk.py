@@ -1,27 +1,44 @@
+from pathlib import Path
+
 from aiohttp import ClientSession
-from async_lru import alru_cache
 
 from sekai.api.exc import ObjectNotFound
 from sekai.api.user import UserApi
+from sekai.api.user.helper.cache import ProfileCache, ProfileCacheStrategy
 from sekai.core.models.card import Deck
 from sekai.core.models.user import Achievement, UserInfo
+from sekai.utils.http import SessionPool
 
-from ._models.profile import Profile
+from ._models.profile import LazyProfile, Profile
 
 DEFAULT_API = "https://api.unipjsk.com"
 
-CACHE_TTL = 180
-
 
 class UnipjskApi(UserApi):
     _api: str
+    _pool: SessionPool
+    _profiles: ProfileCache[Profile | LazyProfile]
 
-    def __init__(self, api: str | None = None) -> None:
+    def __init__(
+        self,
+        api: str | None = None,
+        pool: SessionPool | None = None,
+        profile_cache_path: Path | None = None,
+        profile_cache_strategy: ProfileCacheStrategy | None = None,
+        lazy_profiles: bool = True,
+    ) -> None:
         self._api = api or DEFAULT_API
+        self._pool = pool or SessionPool()
+        self._profiles = ProfileCache(
+            self._fetch_profile,
+            LazyProfile if lazy_profiles else Profile.model_validate_json,
+            profile_cache_strategy,
+            profile_cache_path,
+        )
 
     @property
     def session(self) -> ClientSession:
-        return ClientSession(self._api)
+        return self._pool.session(self._api)
 
     @staticmethod
     def _check_data(data: bytes) -> bytes:
@@ -29,14 +46,12 @@ class UnipjskApi(UserApi):
             raise ObjectNotFound
         return data
 
-    @alru_cache(ttl=CACHE_TTL)
-    async def _get_profile(self, id: int) -> Profile:
-        async with self.session as session:
-            async with session.get(f"/api/user/{id}/profile") as response:
-                response = response
-                data = self._check_data(await response.read())
-                profile = Profile.model_validate_json(data)
-                return profile
+    async def _fetch_profile(self, id: int) -> bytes:
+        async with self.session.get(f"/api/user/{id}/profile") as response:
+            return self._check_data(await response.read())
+
+    async def _get_profile(self, id: int) -> Profile | LazyProfile:
+        return await self._profiles.get(id)
 
     async def get_user_info(self, id: int) -> UserInfo:
         profile = await self._get_profile(id)
@@ -4,19 +4,22 @@ from aiohttp import ClientResponse, ClientSession
 
 from sekai.assets import AssetProvider, CardPattern
 from sekai.assets.exc import AssetNotFound
+from sekai.utils.http import SessionPool
 
 DEFAULT_SERVER = "https://assets.pjsek.ai"
 
 
 class PjsekaiAssets(AssetProvider):
     _server: str
+    _pool: SessionPool
 
     @property
     def session(self) -> ClientSession:
-        return ClientSession(self._server)
+        return self._pool.session(self._server)
 
-    def __init__(self, server: str | None = None) -> None:
+    def __init__(self, server: str | None = None, pool: SessionPool | None = None) -> None:
         self._server = server or DEFAULT_SERVER
+        self._pool = pool or SessionPool()
 
     @staticmethod
     def _check_response(response: ClientResponse) -> ClientResponse:
@@ -25,10 +28,9 @@ class PjsekaiAssets(AssetProvider):
         return response
 
     async def _fetch_asset(self, path: str) -> bytes:
-        async with self.session as session:
-            async with session.get(path) as response:
-                response = self._check_response(response)
-                return await response.read()
+        async with self.session.get(path) as response:
+            response = self._check_response(response)
+            return await response.read()
 
     async def get_card_banner(self, id: str, pattern: CardPattern) -> bytes:
         path = f"/file/pjsekai-assets/startapp/character/member/{id}/"
@@ -1,12 +1,15 @@
 import asyncio
 import logging
+import signal
 from typing import cast
 
 from aiogram import Bot, Dispatcher
 
 from sekai.api.master.helper.cache import CachedMasterApi
 from sekai.bot import context, environ
+from sekai.bot.cmpnt.account.prefetch import prefetcher
 from sekai.bot.module import ModuleManager
+from sekai.bot.stats import log_stats_periodically
 
 
 async def main():
@@ -18,9 +21,24 @@ async def main():
     context.module_manager = module_manager = ModuleManager(dispatcher)
     module_manager.import_modules_from(environ.module_path)
 
-    cast(CachedMasterApi, context.master_api).run_cache_task()
-
-    await dispatcher.start_polling(bot)
+    master_api = cast(CachedMasterApi, context.master_api)
+    master_api.run_cache_task()
+    # sending sighup checks for master data updates right away.
+    asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, master_api.trigger_check)
+    stats_task = (
+        asyncio.create_task(log_stats_periodically(interval))
+        if (interval := context.common_config.stats_interval)
+        else None
+    )
+
+    try:
+        await dispatcher.start_polling(bot)
+    finally:
+        if stats_task:
+            stats_task.cancel()
+        if prefetcher.running:
+            prefetcher.cancel_task()
+        await context.session_pool.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Awaitable, Callable
+
+from sekai.bot import context
+from sekai.utils.ratelimit import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PrefetchStrategy:
+    # at most this many profiles are fetched in each round.
+    budget: int = 20
+    # accounts are kept warm for this long after their last activity.
+    window: timedelta = timedelta(days=1)
+    interval: timedelta = timedelta(minutes=3)
+
+
+class ProfilePrefetcher:
+    strategy: PrefetchStrategy
+    _fetch: Callable[[int], Awaitable[Any]]
+    _active: OrderedDict[int, float]
+    _task: asyncio.Task[None] | None
+
+    def __init__(
+        self, fetch: Callable[[int], Awaitable[Any]], strategy: PrefetchStrategy | None = None
+    ) -> None:
+        self.strategy = strategy or PrefetchStrategy()
+        self._fetch = fetch
+        self._active = OrderedDict()
+        self._task = None
+
+    def touch(self, id: int) -> None:
+        self._active[id] = time.time()
+        self._active.move_to_end(id)
+        # only the most recent ones fit in the budget anyway.
+        while len(self._active) > self.strategy.budget:
+            self._active.popitem(last=False)
+
+    @property
+    def targets(self) -> list[int]:
+        since = time.time() - self.strategy.window.total_seconds()
+        return [id for id, active in reversed(self._active.items()) if active >= since]
+
+    async def prefetch(self) -> None:
+        with request_priority(Priority.BACKGROUND):
+            for id in self.targets:
+                try:
+                    await self._fetch(id)
+                except Exception:
+                    logger.debug(f"failed to prefetch profile of user {id}.", exc_info=True)
+
+    async def _worker(self) -> None:
+        while True:
+            await asyncio.sleep(self.strategy.interval.total_seconds())
+            await self.prefetch()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def run_task(self) -> None:
+        assert self._task is None, "another prefetch task is running."
+        self._task = asyncio.create_task(self._worker())
+
+    def cancel_task(self) -> None:
+        assert self._task is not None, "no prefetch task is running."
+        self._task.cancel()
+        self._task = None
+
+
+prefetcher = ProfilePrefetcher(
+    context.user_api.get_user_info,
+    PrefetchStrategy(
+        context.common_config.prefetch_budget,
+        context.common_config.prefetch_window,
+        context.common_config.prefetch_interval,
+    ),
+)
@@ -1,4 +1,3 @@
-import asyncio
 import itertools
 import random
 from typing import Mapping, Sequence
@@ -33,7 +32,7 @@ async def emulate_gacha(
     rand: random.Random | None = None,
 ) -> list[CardInfo]:
     cards, weights = zip(*card_weights)
-    cards = await asyncio.gather(*map(context.master_api.get_card_info, cards))
+    cards = await context.master_api.get_card_infos(list(cards))
     groups = {
         rarity: list(zip(*cards))
         for rarity, cards in (
@@ -70,7 +70,7 @@ async def process_audio(music: bytes, metadata: Metadata, offset: float = 0) ->
 
 async def fetch_and_process_audio(query: AudioQuery) -> bytes:
     version = await context.master_api.get_music_version(query.version_id)
-    singers = [await context.master_api.get_character_info(singer) for singer in version.singers]
+    singers = await context.master_api.get_character_infos(version.singers)
     music = await context.master_api.get_music_info(version.music_id)
     match query.type:
         case MusicDownloadType.FULL:
@@ -2,6 +2,7 @@ from datetime import timedelta
 from enum import Enum
 
 from sekai.api.master.helper.search import MatchMethod
+from sekai.api.master.helper.store import StoreFormat
 from sekai.bot.config import Config
 
 
@@ -20,13 +21,34 @@ class BotConfig(Config):
 
 class ServerConfig(Config):
     pjsekai_api: str | None = None
+    pjsekai_page_size: int = 20
+    pjsekai_concurrency: int = 4
     sekaiworld_api: str | None = None
+    sekaiworld_table_ttl: timedelta = timedelta(minutes=10)
     unipjsk_api: str | None = None
+    profile_cache_size: int = 1024
+    profile_cache_ttl: timedelta = timedelta(minutes=3)
+    profile_stale_ttl: timedelta = timedelta(days=1)
+    persist_profiles: bool = True
+    lazy_profiles: bool = True
     pjsekai_assets: str | None = None
     sekaiworld_assets: str | None = None
     user_api: UserApi = UserApi.UNIPJSK
     master_api: MasterApi = MasterApi.SEKAIWORLD
+    # gathered from several sources when given, in order of preference.
+    master_apis: list[MasterApi] | None = None
+    hedge_delay: timedelta = timedelta(seconds=1)
     check_cycle: timedelta = timedelta(hours=1)
+    min_check_cycle: timedelta | None = timedelta(minutes=5)
+    # defaults to the check cycle, so updates outside busy hours are not seen any later.
+    max_check_cycle: timedelta | None = None
+    cache_format: StoreFormat = StoreFormat.FILES
+    # keeps a parsed copy of the cache in each process, best disabled with the mapped format.
+    cache_snapshot: bool = True
+    # requests per second to each upstream host, unlimited when not given.
+    rate_limit: float | None = None
+    rate_limit_burst: int = 10
+    rate_limits: dict[str, float] = {}
 
 
 class SearchConfig(Config):
@@ -40,3 +62,11 @@ class SearchConfig(Config):
 
 class CommonConfig(Config):
     write_data_in_background: bool = True
+    coalesce_requests: bool = True
+    # logs coalescing and rate limiting counters for tuning, disabled when not given.
+    stats_interval: timedelta | None = timedelta(minutes=10)
+    # keeps profiles of recently active bound accounts warm in cache.
+    prefetch_profiles: bool = False
+    prefetch_budget: int = 20
+    prefetch_window: timedelta = timedelta(days=1)
+    prefetch_interval: timedelta = timedelta(minutes=3)
@@ -1,9 +1,12 @@
 from aiogram import Bot
 
+from sekai.api.helper.coalesce import CoalescingApi
 from sekai.api.master.helper.cache import CachedMasterApi, CacheStrategy
+from sekai.api.master.helper.gather import GatherStrategy, MasterApiGatherer
 from sekai.api.master.helper.search import make_master_api_search_helper
 from sekai.api.master.pjsekai import PjsekaiApi
 from sekai.api.master.sekaiworld import SekaiWorldApi
+from sekai.api.user.helper.cache import ProfileCacheStrategy
 from sekai.api.user.unipjsk import UnipjskApi
 from sekai.assets.helper.gather import AssetGatherer
 from sekai.assets.pjsekai import PjsekaiAssets
@@ -16,9 +19,16 @@ from sekai.bot.configs import (
     ServerConfig,
     UserApi,
 )
-from sekai.bot.environ import cache_path, config_path
+from sekai.bot.environ import (
+    cache_path,
+    config_path,
+    profile_cache_path,
+    response_cache_path,
+)
 from sekai.bot.module import ModuleManager
 from sekai.bot.storage import StorageStrategy
+from sekai.utils.http import SessionPool
+from sekai.utils.ratelimit import RateLimit, RateLimiter
 
 bot_config = BotConfig.load(config_path / "bot")
 server_config = ServerConfig.load(config_path / "server")
@@ -29,27 +39,86 @@ bot: Bot
 
 module_manager: ModuleManager
 
-match server_config.master_api:
-    case MasterApi.PJSEKAI:
-        master_api = PjsekaiApi(server_config.pjsekai_api)
-    case MasterApi.SEKAIWORLD:
-        master_api = SekaiWorldApi(server_config.sekaiworld_api)
+rate_limiter = RateLimiter(
+    (
+        RateLimit(server_config.rate_limit, server_config.rate_limit_burst)
+        if server_config.rate_limit
+        else None
+    ),
+    {
+        host: RateLimit(rate, server_config.rate_limit_burst)
+        for host, rate in server_config.rate_limits.items()
+    },
+)
+
+session_pool = SessionPool(limiter=rate_limiter)
+
+master_apis: list[PjsekaiApi | SekaiWorldApi] = []
+
+for master_api_type in server_config.master_apis or [server_config.master_api]:
+    match master_api_type:
+        case MasterApi.PJSEKAI:
+            master_apis.append(
+                PjsekaiApi(
+                    server_config.pjsekai_api,
+                    session_pool,
+                    server_config.pjsekai_page_size,
+                    server_config.pjsekai_concurrency,
+                )
+            )
+        case MasterApi.SEKAIWORLD:
+            master_apis.append(
+                SekaiWorldApi(
+                    server_config.sekaiworld_api,
+                    response_cache_path / "sekaiworld",
+                    session_pool,
+                    server_config.sekaiworld_table_ttl,
+                )
+            )
+
+if len(master_apis) > 1:
+    gather_strategy = GatherStrategy(server_config.hedge_delay.total_seconds())
+    master_api = MasterApiGatherer(master_apis, gather_strategy)  # type: ignore
+else:
+    master_api = master_apis[0]
 
 master_api = make_master_api_search_helper(CachedMasterApi)(
     # PjsekaiApi(server_config.pjsekai_api),
     master_api,
     cache_path,
-    CacheStrategy(server_config.check_cycle),
+    CacheStrategy(
+        server_config.check_cycle,
+        server_config.min_check_cycle,
+        server_config.max_check_cycle,
+        snapshot=server_config.cache_snapshot,
+        format=server_config.cache_format,
+    ),
 )  # type: ignore
 
+if common_config.coalesce_requests:
+    master_api = CoalescingApi(master_api)  # type: ignore
+
 match server_config.user_api:
     case UserApi.UNIPJSK:
-        user_api = UnipjskApi(server_config.unipjsk_api)
+        user_api = UnipjskApi(
+            server_config.unipjsk_api,
+            session_pool,
+            profile_cache_path / "unipjsk" if server_config.persist_profiles else None,
+            ProfileCacheStrategy(
+                server_config.profile_cache_size,
+                server_config.profile_cache_ttl,
+                server_config.profile_stale_ttl,
+            ),
+            server_config.lazy_profiles,
+        )
+
+if common_config.coalesce_requests:
+    user_api = CoalescingApi(user_api)  # type: ignore
 
 assets = AssetGatherer(
     [
-        SekaiWorldAssets(server_config.sekaiworld_assets),
-        PjsekaiAssets(server_config.pjsekai_assets),
+        SekaiWorldAssets(server_config.sekaiworld_assets, session_pool),
+        PjsekaiAssets(server_config.pjsekai_assets, session_pool),
     ]
 )  # type: ignore
 
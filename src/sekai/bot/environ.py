@@ -16,6 +16,12 @@ resource_path = working_dir / "res"  # should exists
 cache_path = data_path / "cache"
 cache_path.mkdir(exist_ok=True)
 
+response_cache_path = data_path / "responses"
+response_cache_path.mkdir(exist_ok=True)
+
+profile_cache_path = data_path / "profiles"
+profile_cache_path.mkdir(exist_ok=True)
+
 module_data_path = data_path / "module"
 module_data_path.mkdir(exist_ok=True)
 
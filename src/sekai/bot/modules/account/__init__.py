@@ -1,11 +1,20 @@
+from typing import Any, Awaitable, Callable
+
 from aiogram.enums import ParseMode
 from aiogram.filters.command import Command
-from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
+from aiogram.types import (
+    CallbackQuery,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    Message,
+    TelegramObject,
+)
 
 from sekai.bot import context
 from sekai.bot.cmpnt import EventCallbackQuery, EventCommand
 from sekai.bot.cmpnt.account.events import AccountBindEvent
 from sekai.bot.cmpnt.account.models import Account
+from sekai.bot.cmpnt.account.prefetch import prefetcher
 from sekai.bot.cmpnt.account.storage import accounts
 from sekai.bot.cmpnt.card.events import DeckEvent
 from sekai.bot.cmpnt.user.events import AchievementEvent, ProfileEvent
@@ -13,6 +22,27 @@ from sekai.bot.cmpnt.user.events import AchievementEvent, ProfileEvent
 router = context.module_manager.create_router()
 
 
+async def track_activity(
+    handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+    event: TelegramObject,
+    data: dict[str, Any],
+) -> Any:
+    if (
+        isinstance(event, Message | CallbackQuery)
+        and event.from_user
+        and (account := await accounts.get(event.from_user.id))
+    ):
+        prefetcher.touch(account.user_id)
+    return await handler(event, data)
+
+
+if context.common_config.prefetch_profiles:
+    # registered on the root router, so activity in every module is seen.
+    context.module_manager.root_router.message.outer_middleware(track_activity)
+    context.module_manager.root_router.callback_query.outer_middleware(track_activity)
+    prefetcher.run_task()
+
+
 @router.callback_query(EventCallbackQuery(AccountBindEvent))
 @router.message(EventCommand("bind", event=AccountBindEvent))
 async def bind(update: Message | CallbackQuery, event: AccountBindEvent):
@@ -22,6 +52,7 @@ async def bind(update: Message | CallbackQuery, event: AccountBindEvent):
     target = update.from_user.id  # type: ignore
     account = Account(user_id=event.id)
     await accounts.set(target, account)
+    prefetcher.touch(account.user_id)
     await message.reply(
         f"Your account is successfully bound with user <code>{event.id}</code>.",
         parse_mode=ParseMode.HTML,
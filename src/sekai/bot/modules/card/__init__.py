@@ -34,8 +34,8 @@ async def deck(update: Message | CallbackQuery, event: DeckEvent):
     assert (message := update if isinstance(update, Message) else update.message)
     hint_message = await message.reply("Fetching data...")
     deck = await context.user_api.get_user_main_deck(event.id)
-    cards = [await context.master_api.get_card_info(card.id) for card in deck.members]
-    charas = [await context.master_api.get_game_character(card.character) for card in cards]
+    cards = await context.master_api.get_card_infos([card.id for card in deck.members])
+    charas = await context.master_api.get_game_characters([card.character for card in cards])
     buttons = [
         InlineKeyboardButton(
             text=chara.name,
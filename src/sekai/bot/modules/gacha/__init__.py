@@ -46,13 +46,11 @@ async def gacha_id(update: Message | CallbackQuery, event: GachaEvent):
     gacha = await context.master_api.get_gacha(event.id)
     logo = await gacha_logos.get(gacha.asset_id)
     logo = BufferedInputFile(logo, complete_filename(gacha.asset_id, logo))
-    pickups = [
-        (
-            (card := await context.master_api.get_card_info(pickup)),
-            await context.master_api.get_game_character(card.character),
-        )
-        for pickup in gacha.pickup_cards
-    ]
+    pickup_cards = await context.master_api.get_card_infos(gacha.pickup_cards)
+    pickup_charas = await context.master_api.get_game_characters(
+        [card.character for card in pickup_cards]
+    )
+    pickups = list(zip(pickup_cards, pickup_charas))
     pickup_infos = "\n".join(f"・{chara.name}: {card.title}" for card, chara in pickups)
     summary = textwrap.shorten(gacha.summary, 250)
     normal_rates = "\n".join(
@@ -195,10 +193,8 @@ async def do_gacha(update: Message | CallbackQuery, event: DoGachaEvent):
                 (emulate.calculate_normal_rarity_rates(gacha), 9),
             )
     await hint_message.edit_text("Fetching card infos and banners...")
-    charas = {
-        chara: await context.master_api.get_game_character(chara)
-        for chara in set(card.character for card in cards)
-    }
+    chara_ids = list(set(card.character for card in cards))
+    charas = dict(zip(chara_ids, await context.master_api.get_game_characters(chara_ids)))
     queries = [CardPhotoQuery(asset_id=card.asset_id, pattern=CardPattern.NORMAL) for card in cards]
     banners = await asyncio.gather(*map(card_banners.get, queries))
     await hint_message.edit_text("Generating result image...")
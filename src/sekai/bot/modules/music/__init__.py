@@ -35,7 +35,7 @@ async def music_id(update: Message | CallbackQuery, event: MusicEvent):
             for i in range(len(all_singers))
             if i == all_singers.index(all_singers[i])
         ]
-        all_charas = [await context.master_api.get_character_info(singer) for singer in all_singers]
+        all_charas = await context.master_api.get_character_infos(all_singers)
         return [
             [all_charas[all_singers.index(singer)].name for singer in version.singers]
             for version in versions
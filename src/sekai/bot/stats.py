@@ -0,0 +1,24 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from sekai.api.helper.coalesce import CoalescingApi
+from sekai.bot import context
+
+logger = logging.getLogger(__name__)
+
+
+def log_stats() -> None:
+    apis: dict[str, object] = {"master api": context.master_api, "user api": context.user_api}
+    for name, api in apis.items():
+        if isinstance(api, CoalescingApi):
+            logger.debug(f"{name} coalescing: {str(api.stats) or 'no calls'}.")
+    for host, stats in context.rate_limiter.stats.items():
+        logger.debug(f"rate limit of {host}: {stats}.")
+
+
+async def log_stats_periodically(interval: timedelta) -> None:
+    # counters are kept since start, so the latest line tells the whole run.
+    while True:
+        await asyncio.sleep(interval.total_seconds())
+        log_stats()
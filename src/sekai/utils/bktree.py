@@ -0,0 +1,55 @@
+from typing import Generic, Iterator, TypeVar
+
+_T = TypeVar("_T")
+
+
+def edit_distance(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+class BKNode(Generic[_T]):
+    word: str
+    values: list[_T]
+    children: dict[int, "BKNode[_T]"]
+
+    def __init__(self, word: str) -> None:
+        self.word = word
+        self.values = []
+        self.children = {}
+
+
+class BKTree(Generic[_T]):
+    # children are keyed by edit distance, so searches skip subtrees by triangle inequality.
+    root: BKNode[_T] | None
+
+    def __init__(self) -> None:
+        self.root = None
+
+    def add(self, word: str, value: _T) -> None:
+        if self.root is None:
+            self.root = BKNode(word)
+        node = self.root
+        while (distance := edit_distance(word, node.word)) != 0:
+            if (child := node.children.get(distance)) is None:
+                child = node.children[distance] = BKNode(word)
+            node = child
+        node.values.append(value)
+
+    def search(self, word: str, radius: int) -> Iterator[tuple[int, str, list[_T]]]:
+        nodes = [self.root] if self.root is not None else []
+        while nodes:
+            node = nodes.pop()
+            distance = edit_distance(word, node.word)
+            if distance <= radius:
+                yield distance, node.word, node.values
+            for child_distance, child in node.children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    nodes.append(child)
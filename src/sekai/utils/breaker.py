@@ -0,0 +1,37 @@
+import time
+from datetime import timedelta
+from enum import IntEnum, auto
+
+
+class BreakerState(IntEnum):
+    CLOSED = auto()
+    OPEN = auto()
+    HALF_OPEN = auto()
+
+
+class CircuitBreaker:
+    # stays open for a cooldown after tripping, then lets a single attempt probe the upstream.
+    cooldown: timedelta
+    _opened: float | None
+
+    def __init__(self, cooldown: timedelta) -> None:
+        self.cooldown = cooldown
+        self._opened = None
+
+    @property
+    def remaining(self) -> float:
+        if self._opened is None:
+            return 0
+        return max(0, self._opened + self.cooldown.total_seconds() - time.monotonic())
+
+    @property
+    def state(self) -> BreakerState:
+        if self._opened is None:
+            return BreakerState.CLOSED
+        return BreakerState.OPEN if self.remaining else BreakerState.HALF_OPEN
+
+    def trip(self) -> None:
+        self._opened = time.monotonic()
+
+    def reset(self) -> None:
+        self._opened = None
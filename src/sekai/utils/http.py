@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from http import HTTPStatus
+from pathlib import Path
+from typing import AsyncIterator
+
+from aiofile import async_open
+from aiohttp import (
+    ClientResponse,
+    ClientSession,
+    TCPConnector,
+    TraceConfig,
+    TraceRequestStartParams,
+)
+from pydantic import BaseModel
+
+from sekai.utils.ratelimit import RateLimiter
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class PoolStrategy:
+    limit: int = 100
+    limit_per_host: int = 8
+    keepalive_timeout: float = 30
+    dns_cache_ttl: int = 300
+
+
+class SessionPool:
+    strategy: PoolStrategy
+    limiter: RateLimiter | None
+    _connector: TCPConnector | None
+    _sessions: dict[str, ClientSession]
+
+    def __init__(
+        self, strategy: PoolStrategy | None = None, limiter: RateLimiter | None = None
+    ) -> None:
+        self.strategy = strategy or PoolStrategy()
+        self.limiter = limiter
+        self._connector = None
+        self._sessions = {}
+
+    @property
+    def connector(self) -> TCPConnector:
+        # created lazily, since the connector should be bound to a running event loop.
+        if self._connector is None or self._connector.closed:
+            self._connector = TCPConnector(
+                limit=self.strategy.limit,
+                limit_per_host=self.strategy.limit_per_host,
+                keepalive_timeout=self.strategy.keepalive_timeout,
+                ttl_dns_cache=self.strategy.dns_cache_ttl,
+            )
+        return self._connector
+
+    async def _on_request_start(
+        self, session: ClientSession, context: object, params: TraceRequestStartParams
+    ) -> None:
+        # every request waits for its turn here, before it is sent.
+        if self.limiter and params.url.host:
+            await self.limiter.acquire(params.url.host)
+
+    def _trace_configs(self) -> list[TraceConfig]:
+        if not self.limiter:
+            return []
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)  # type: ignore
+        return [trace_config]
+
+    def session(self, base_url: str) -> ClientSession:
+        session = self._sessions.get(base_url)
+        if session is None or session.closed:
+            session = self._sessions[base_url] = ClientSession(
+                base_url,
+                connector=self.connector,
+                connector_owner=False,
+                trace_configs=self._trace_configs(),
+            )
+        return session
+
+    async def close(self) -> None:
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+
+class Validators(BaseModel):
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @classmethod
+    def from_response(cls, response: ClientResponse) -> "Validators":
+        return cls(
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    def to_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    path: Path
+    _locks: dict[str, asyncio.Lock]
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._locks = {}
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return hashlib.sha1(path.encode()).hexdigest()
+
+    def _body_path(self, path: str) -> Path:
+        return (self.path / self._key(path)).with_suffix(".body")
+
+    def _validators_path(self, path: str) -> Path:
+        return (self.path / self._key(path)).with_suffix(".meta")
+
+    async def validators(self, path: str) -> Validators | None:
+        validators_path = self._validators_path(path)
+        if not validators_path.exists() or not self._body_path(path).exists():
+            return None
+        async with async_open(validators_path, "r") as afp:
+            data = await afp.read()
+        return Validators.model_validate_json(data)
+
+    async def _write_validators(self, path: str, validators: Validators) -> None:
+        async with async_open(self._validators_path(path), "w") as afp:
+            await afp.write(validators.model_dump_json())
+
+    async def stream(
+        self, session: ClientSession, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        validators = await self.validators(path)
+        headers = validators.to_headers() if validators else {}
+        async with session.get(path, headers=headers) as response:
+            if validators and response.status == HTTPStatus.NOT_MODIFIED:
+                async with async_open(self._body_path(path), "rb") as afp:
+                    async for chunk in afp.iter_chunked(chunk_size):
+                        yield chunk  # type: ignore
+                return
+            fresh = Validators.from_response(response)
+            if not response.ok or not (fresh.etag or fresh.last_modified):
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+                return
+            # written aside while streaming, so an interrupted body never replaces the cached one,
+            # and each stream has its own file, so concurrent streams of a path do not mix.
+            fd, part = tempfile.mkstemp(".part", self._key(path), self.path)
+            os.close(fd)
+            part_path = Path(part)
+            try:
+                async with async_open(part_path, "wb") as afp:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        await afp.write(chunk)
+                        yield chunk
+            except BaseException:
+                part_path.unlink(missing_ok=True)
+                raise
+            # the body and its validators are replaced together, so they always match.
+            async with self._locks.setdefault(path, asyncio.Lock()):
+                os.replace(part_path, self._body_path(path))
+                await self._write_validators(path, fresh)
+
+    async def fetch(self, session: ClientSession, path: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(session, path)])
@@ -0,0 +1,99 @@
+import re
+
+_TOKEN = re.compile(rb'["\\\[\]{},]')
+_STRING_TOKEN = re.compile(rb'["\\]')
+
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_COMMA = ord(",")
+_OPENINGS = b"[{"
+_CLOSINGS = b"]}"
+
+
+class ArrayItemSplitter:
+    # splits a top-level json array into the raw bytes of its items as data is fed.
+    _buffer: bytearray
+    _pos: int
+    _start: int | None
+    _depth: int
+    _in_string: bool
+    _finished: bool
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._finished = False
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def _flush(self, end: int) -> bytes | None:
+        assert self._start is not None
+        item = bytes(self._buffer[self._start : end]).strip()
+        self._start = end + 1
+        return item or None
+
+    def _check_trailing(self, data: bytes | bytearray) -> None:
+        # chunk boundaries are arbitrary, so whitespace may still come after the array.
+        if data.strip():
+            raise ValueError("unexpected data after json array.")
+
+    def feed(self, data: bytes) -> list[bytes]:
+        if self._finished:
+            self._check_trailing(data)
+            return []
+        buffer = self._buffer
+        buffer += data
+        items: list[bytes] = []
+        pos = self._pos
+        while not self._finished:
+            match = (_STRING_TOKEN if self._in_string else _TOKEN).search(buffer, pos)
+            if not match:
+                pos = len(buffer)
+                break
+            index = match.start()
+            char = buffer[index]
+            pos = index + 1
+            if self._in_string:
+                if char == _BACKSLASH:
+                    if index + 1 >= len(buffer):
+                        # the escaped character is in the next chunk.
+                        pos = index
+                        break
+                    pos = index + 2
+                else:
+                    self._in_string = False
+            elif char == _QUOTE:
+                self._in_string = True
+            elif char in _OPENINGS:
+                self._depth += 1
+                if self._depth == 1:
+                    if char != _OPENINGS[0]:
+                        raise ValueError("top-level json value is not an array.")
+                    self._start = pos
+            elif char in _CLOSINGS:
+                self._depth -= 1
+                if self._depth == 0:
+                    if item := self._flush(index):
+                        items.append(item)
+                    self._finished = True
+                    self._check_trailing(buffer[pos:])
+            elif char == _COMMA and self._depth == 1:
+                if item := self._flush(index):
+                    items.append(item)
+        # drop consumed data, so the buffer only holds the item being received.
+        keep = self._start if self._start is not None else pos
+        keep = min(keep, pos)
+        del buffer[:keep]
+        self._pos = pos - keep
+        if self._start is not None:
+            self._start -= keep
+        return items
+
+    def close(self) -> None:
+        if not self._finished:
+            raise ValueError("json array is incomplete.")
@@ -0,0 +1,155 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum, auto
+from typing import Generator, Iterator
+
+
+class Priority(IntEnum):
+    INTERACTIVE = auto()
+    BACKGROUND = auto()
+
+
+_priority: ContextVar[Priority] = ContextVar("priority", default=Priority.INTERACTIVE)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def request_priority(priority: Priority) -> Generator[None, None, None]:
+    # inherited by the tasks created inside, so a whole job can be marked at once.
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate: float
+    burst: int = 10
+
+
+@dataclass
+class LimiterStats:
+    waiting: dict[Priority, int] = field(default_factory=dict)
+    acquired: int = 0
+    waited: int = 0
+    wait_time: float = 0
+    max_wait: float = 0
+
+    def __str__(self) -> str:
+        waiting = ", ".join(
+            f"{priority.name.lower()}: {count}" for priority, count in self.waiting.items()
+        )
+        average = self.wait_time / self.waited if self.waited else 0
+        return (
+            f"waiting ({waiting or 'none'}), {self.waited}/{self.acquired} waited, "
+            f"{average:.3f}s on average, {self.max_wait:.3f}s at most"
+        )
+
+
+class TokenBucket:
+    # waiters are served by priority first, then in arrival order.
+    limit: RateLimit
+    _tokens: float
+    _updated: float
+    _waiters: list[tuple[Priority, int, asyncio.Future[None]]]
+    _counter: Iterator[int]
+    _timer: asyncio.TimerHandle | None
+    _stats: LimiterStats
+
+    def __init__(self, limit: RateLimit) -> None:
+        assert limit.rate > 0 and limit.burst > 0, "rate and burst should be positive."
+        self.limit = limit
+        self._tokens = limit.burst
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._counter = itertools.count()
+        self._timer = None
+        self._stats = LimiterStats()
+
+    @property
+    def stats(self) -> LimiterStats:
+        waiting: dict[Priority, int] = {}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                waiting[priority] = waiting.get(priority, 0) + 1
+        self._stats.waiting = dict(sorted(waiting.items()))
+        return self._stats
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.limit.burst, self._tokens + (now - self._updated) * self.limit.rate)
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        # drop cancelled waiters, so they do not keep the timer running.
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._waiters:
+            delay = (1 - self._tokens) / self.limit.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def acquire(self, priority: Priority | None = None) -> None:
+        self._stats.acquired += 1
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority or current_priority(), next(self._counter), future))
+        if self._timer is None:
+            self._dispatch()
+        start = time.monotonic()
+        try:
+            await future
+        finally:
+            wait = time.monotonic() - start
+            self._stats.waited += 1
+            self._stats.wait_time += wait
+            self._stats.max_wait = max(self._stats.max_wait, wait)
+
+
+class RateLimiter:
+    default: RateLimit | None
+    limits: dict[str, RateLimit]
+    _buckets: dict[str, TokenBucket]
+
+    def __init__(
+        self, default: RateLimit | None = None, limits: dict[str, RateLimit] | None = None
+    ) -> None:
+        self.default = default
+        self.limits = limits or {}
+        self._buckets = {}
+
+    def bucket(self, host: str) -> TokenBucket | None:
+        if (bucket := self._buckets.get(host)) is not None:
+            return bucket
+        if (limit := self.limits.get(host, self.default)) is None:
+            return None
+        bucket = self._buckets[host] = TokenBucket(limit)
+        return bucket
+
+    async def acquire(self, host: str, priority: Priority | None = None) -> None:
+        if (bucket := self.bucket(host)) is not None:
+            await bucket.acquire(priority)
+
+    @property
+    def stats(self) -> dict[str, LimiterStats]:
+        return {host: bucket.stats for host, bucket in self._buckets.items()}
@@ -0,0 +1,71 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from sekai.utils.http import ResponseCache
+
+ETAG = '"v1"'
+
+BODY = b"[" + b",".join(b'{"id": %d}' % i for i in range(2000)) + b"]"
+
+
+class ResponseCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.requests = 0
+        app = web.Application()
+        app.router.add_get("/master.json", self.handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = ClientSession(str(self.server.make_url("/")))
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+        self.cache = ResponseCache(self.path)
+
+    async def asyncTearDown(self) -> None:
+        await self.session.close()
+        await self.server.close()
+        self.directory.cleanup()
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304)
+        response = web.StreamResponse(headers={"ETag": ETAG})
+        await response.prepare(request)
+        # sent in pieces, so concurrent streams interleave their writes.
+        for start in range(0, len(BODY), 4096):
+            await response.write(BODY[start : start + 4096])
+            await asyncio.sleep(0)
+        await response.write_eof()
+        return response
+
+    async def test_concurrent_fetches(self) -> None:
+        bodies = await asyncio.gather(
+            *(self.cache.fetch(self.session, "/master.json") for _ in range(3))
+        )
+        self.assertEqual(bodies, [BODY] * 3)
+        self.assertEqual([path.suffix for path in self.path.iterdir()].count(".part"), 0)
+        validators = await self.cache.validators("/master.json")
+        assert validators
+        self.assertEqual(validators.etag, ETAG)
+
+    async def test_not_modified(self) -> None:
+        await self.cache.fetch(self.session, "/master.json")
+        self.assertEqual(await self.cache.fetch(self.session, "/master.json"), BODY)
+        self.assertEqual(self.requests, 2)
+
+    async def test_interrupted_stream(self) -> None:
+        stream = self.cache.stream(self.session, "/master.json", 1024)
+        async for _ in stream:
+            break
+        await stream.aclose()  # type: ignore
+        self.assertEqual(list(self.path.iterdir()), [])
+        self.assertIsNone(await self.cache.validators("/master.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()